@@ -1,7 +1,10 @@
 import os
 import json
+import time
 import requests
 
+from instrumentation import recorder, start_run
+
 # --- Configuration ---
 SOURCE_DIR = "vocab_json"        # Folder containing your existing JSON files
 OUTPUT_DIR = "vocab_output_jsons"       # Folder to save updated JSON files
@@ -9,9 +12,11 @@ API_URL = "https://api.datamuse.com/words?sp={word}"  # Example endpoint
 
 # --- Function to fetch frequency data ---
 def fetch_word_frequency(word):
+    start = time.perf_counter()
     try:
         # Example using Datamuse API; replace with your real endpoint as needed
         response = requests.get(API_URL.format(word=word))
+        recorder().record_call("datamuse.latency_s", time.perf_counter() - start, word=word)
         response.raise_for_status()
         data = response.json()
         # Example: Datamuse returns a list of word objects that may contain 'score' or 'tags'
@@ -21,26 +26,34 @@ def fetch_word_frequency(word):
             return data[0].get("score", 0)
         return None
     except requests.RequestException:
+        recorder().count("datamuse.errors")
         return None
 
 # --- Ensure output directory exists ---
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # --- Process JSON files ---
-for filename in os.listdir(SOURCE_DIR):
-    if filename.endswith(".json"):
-        source_path = os.path.join(SOURCE_DIR, filename)
-        output_path = os.path.join(OUTPUT_DIR, filename)
-
-        with open(source_path, "r", encoding="utf-8") as f:
-            word_data = json.load(f)
-
-        word = word_data.get("word")
-        if word:
-            frequency = fetch_word_frequency(word)
-            word_data["frequency"] = frequency
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(word_data, f, indent=2, ensure_ascii=False)
-
-        print(f"Processed: {filename} → frequency={frequency}")
\ No newline at end of file
+run = start_run("addwordfreq")
+try:
+    with run.stage("frequency"):
+        for filename in os.listdir(SOURCE_DIR):
+            if filename.endswith(".json"):
+                source_path = os.path.join(SOURCE_DIR, filename)
+                output_path = os.path.join(OUTPUT_DIR, filename)
+
+                with open(source_path, "r", encoding="utf-8") as f:
+                    word_data = json.load(f)
+
+                frequency = None
+                word = word_data.get("word")
+                if word:
+                    frequency = fetch_word_frequency(word)
+                    word_data["frequency"] = frequency
+                    run.count("words.with_frequency" if frequency is not None else "words.without_frequency")
+
+                with open(output_path, "w", encoding="utf-8") as f:
+                    json.dump(word_data, f, indent=2, ensure_ascii=False)
+
+                print(f"Processed: {filename} → frequency={frequency}")
+finally:
+    run.close()
\ No newline at end of file
@@ -1,23 +1,14 @@
-from google import genai
-from google.genai.types import (
-    GenerateContentConfig,
-    GoogleSearch,
-    HttpOptions,
-    Tool,
-)
-import os
+import json
 import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    print("Error: Please set GEMINI_API_KEY environment variable.")
-    sys.exit(1)
+from geminicascade import generate_with_cascade
+from geminiclient import MissingAPIKeyError, get_client
+from instrumentation import start_run
 
-def get_word_info(word: str):
-    # ✅ Use v1alpha for grounding support
-    client = genai.Client(http_options=HttpOptions(api_version="v1alpha"))
 
-    prompt = f"""
+def build_prompt(word: str) -> str:
+    return f"""
     You are a dictionary assistant. For the word "{word}", provide the following:
     - Recent usage: a natural example sentence
     - Definition: clear and concise
@@ -29,24 +20,97 @@ def get_word_info(word: str):
     "word", "recent_usage", "definition", "etymology", "synonyms", "antonyms".
     """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config=GenerateContentConfig(
-            tools=[
-                Tool(google_search=GoogleSearch())  # ✅ Ground with Google Search
-            ]
-        ),
-    )
 
-    return response.text
+def lookup_word(word: str):
+    """Return (text, parsed); parsed is None if no cascade tier produced a valid entry."""
+    # Cheapest model first, escalating to grounding / larger models on bad output
+    return generate_with_cascade(get_client(), build_prompt(word), word)
+
+
+def get_word_info(word: str):
+    text, _ = lookup_word(word)
+    return text
+
+
+def _result_line(index, word, future):
+    record = {"index": index, "word": word}
+    try:
+        text, parsed = future.result()
+    except Exception as e:
+        record.update(ok=False, error=f"{type(e).__name__}: {e}")
+    else:
+        record["ok"] = parsed is not None
+        if parsed is not None:
+            record["result"] = parsed
+        else:
+            record["raw"] = text
+    return json.dumps(record, ensure_ascii=False)
+
+
+def stream_words(words, out=sys.stdout, jobs=4):
+    """Look up words concurrently and write one JSONL line per word as each finishes.
+
+    At most 2 * jobs words are read ahead of the workers, so an unbounded
+    input stream is processed in bounded memory. Lines come out in
+    completion order with the word's input index attached.
+    """
+    # Create the client (and fail on a missing API key) once, not per worker
+    get_client()
+    in_flight = {}
+
+    def drain_completed():
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            out.write(_result_line(*in_flight.pop(future), future) + "\n")
+        out.flush()
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for index, word in enumerate(words):
+            in_flight[pool.submit(lookup_word, word)] = (index, word)
+            if len(in_flight) >= 2 * jobs:
+                drain_completed()
+        while in_flight:
+            drain_completed()
+
+
+def read_words(f):
+    for line in f:
+        word = line.strip()
+        if word:
+            yield word
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python word_info_grounded.py <word>")
-        sys.exit(1)
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Look up words with Gemini. One word prints its entry; "
+        "otherwise words are read one per line and streamed out as JSONL."
+    )
+    parser.add_argument("word", nargs="?", help="a single word; omit or use '-' to read words from stdin")
+    parser.add_argument("-f", "--file", help="read words from this file instead of stdin")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="concurrent requests (default: 4)")
+    args = parser.parse_args()
 
-    word = sys.argv[1]
-    result = get_word_info(word)
-    print(result)
\ No newline at end of file
+    if args.word and args.word != "-" and not args.file:
+        try:
+            print(get_word_info(args.word))
+        except MissingAPIKeyError as e:
+            sys.exit(f"Error: {e}")
+    elif args.file or args.word == "-" or not sys.stdin.isatty():
+        # stdout carries the JSONL results, so the run summary goes to stderr
+        run = start_run("ankidefinition")
+        try:
+            with run.stage("stream"):
+                if args.file:
+                    with open(args.file, "r", encoding="utf-8") as f:
+                        stream_words(read_words(f), jobs=args.jobs)
+                else:
+                    stream_words(read_words(sys.stdin), jobs=args.jobs)
+        except MissingAPIKeyError as e:
+            sys.exit(f"Error: {e}")
+        finally:
+            run.close(file=sys.stderr)
+    else:
+        parser.print_usage()
+        sys.exit(1)
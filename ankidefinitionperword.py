@@ -1,94 +1,25 @@
-import sqlite3
 import json
-import zipfile
-import os
 import sys
-import re
-import html
 from pathlib import Path
 
-# Gemini API (grounded)
-from google import genai
-from google.genai.types import (
-    GenerateContentConfig,
-    GoogleSearch,
-    HttpOptions,
-    Tool,
+from decksync import SYNC_STATE_DB, extract_sort_field_words, last_synced, live_words, sync_deck
+from geminibatch import GeminiBatchClient, run_batch
+from geminicascade import generate_with_cascade
+from geminiclient import MissingAPIKeyError, get_client
+from instrumentation import recorder, start_run
+from wordnorm import (
+    build_canonical_index,
+    normalize_word,
+    output_stem,
+    print_dedup_report,
+    read_index,
+    safe_word,
+    write_index,
 )
 
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    print("Error: Please set GEMINI_API_KEY environment variable.")
-    sys.exit(1)
-
-# Configure Gemini client
-client = genai.Client(http_options=HttpOptions(api_version="v1alpha"))
-
-
-def clean_field_value(value: str) -> str:
-    """Clean Anki field value: remove HTML tags, decode entities, strip spaces."""
-    # Decode HTML entities (&nbsp;, &amp;, etc.)
-    value = html.unescape(value)
-    # Remove HTML tags like <br>, <div>, etc.
-    value = re.sub(r"<[^>]+>", " ", value)
-    # Collapse multiple spaces
-    value = re.sub(r"\s+", " ", value)
-    return value.strip()
-
-
-def extract_sort_field_words(apkg_path):
-    """Extract all sort field values (words) from an Anki .apkg deck."""
-    with zipfile.ZipFile(apkg_path, "r") as z:
-        if "collection.anki2" not in z.namelist():
-            raise FileNotFoundError("collection.anki2 not found in the .apkg file")
-        z.extract("collection.anki2", path=".")
-
-    conn = sqlite3.connect("collection.anki2")
-    cursor = conn.cursor()
-
-    # Load models
-    cursor.execute("SELECT models FROM col")
-    row = cursor.fetchone()
-    if not row:
-        raise ValueError("No models found in collection.anki2")
-    models = json.loads(row[0])
-
-    # Map model_id -> sort field index
-    model_info = {}
-    for model_id, model in models.items():
-        sort_field_index = model.get("sortf", 0)
-        model_info[int(model_id)] = sort_field_index
-
-    # Extract notes
-    cursor.execute("SELECT mid, flds FROM notes")
-    notes = cursor.fetchall()
-
-    words = []
-    for mid, flds in notes:
-        if mid not in model_info:
-            continue
-        sort_field_index = model_info[mid]
-        field_values = flds.split("\x1f")
-        if 0 <= sort_field_index < len(field_values):
-            raw_word = field_values[sort_field_index]
-            word = clean_field_value(raw_word)
-            if word:
-                words.append(word)
-
-    conn.close()
-    os.remove("collection.anki2")
-    return words
-
-
-def clean_json_response(text: str) -> str:
-    """Remove ```json fences and return clean JSON string."""
-    cleaned = re.sub(r"^```json\s*|\s*```$", "", text.strip(), flags=re.DOTALL | re.MULTILINE)
-    return cleaned.strip()
 
-
-def fetch_word_info(word: str):
-    """Fetch definition, usage, synonyms, antonyms, etc. from Gemini (grounded)."""
-    prompt = f"""
+def build_prompt(word: str) -> str:
+    return f"""
     You are a dictionary assistant. For the word "{word}", provide the following:
     - Recent usage: a natural example sentence
     - Definition: clear and concise
@@ -100,55 +31,227 @@ def fetch_word_info(word: str):
     "word", "recent_usage", "definition", "etymology", "synonyms", "antonyms".
     """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash-lite",
-        contents=prompt,
-        config=GenerateContentConfig(
-            tools=[Tool(google_search=GoogleSearch())]  # ✅ Ground with Google Search
-        ),
-    )
 
-    return clean_json_response(response.text)
+def fetch_word_info(word: str):
+    """Fetch definition, usage, synonyms, antonyms, etc. from the Gemini model cascade."""
+    text, _ = generate_with_cascade(get_client(), build_prompt(word), word)
+    return text
 
 
-def main(apkg_path, output_folder="output"):
-    Path(output_folder).mkdir(parents=True, exist_ok=True)
+def output_path_for(group, output_folder):
+    return Path(output_folder) / f"{group['file']}.json"
+
+
+def save_word_info(word, result, out_path):
+    """Validate a model response and save it, falling back to raw text."""
+    try:
+        parsed = json.loads(result)
+    except json.JSONDecodeError:
+        print(f"⚠️ Warning: Gemini returned invalid JSON for {word}, saving raw text.")
+        recorder().count("words.saved_raw")
+        parsed = {"word": word, "raw": result}
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(parsed, f, ensure_ascii=False, indent=2)
+
+    recorder().count("words.saved")
+    print(f"💾 Saved {word} → {out_path}")
+
 
-    words = extract_sort_field_words(apkg_path)
-    print(f"Found {len(words)} words in deck.")
+def enrich_batch(targets, output_folder, batch_client=None, poll_interval=30):
+    """Enrich {word: out_path} through Gemini Batch jobs instead of one call per word."""
+    if batch_client is None:
+        batch_client = GeminiBatchClient(get_client())
 
-    for word in words:
-        safe_word = re.sub(r"[^a-zA-Z0-9_-]+", "_", word)  # safe filename
-        out_path = Path(output_folder) / f"{safe_word}.json"
+    def on_result(word, text, parsed):
+        save_word_info(word, text, targets[word])
 
+    prompts = {word: build_prompt(word) for word in targets}
+    never_returned = run_batch(
+        prompts,
+        batch_client,
+        on_result,
+        work_dir=Path(output_folder) / ".batch",
+        poll_interval=poll_interval,
+    )
+    for word in sorted(never_returned):
+        print(f"❌ No batch result for {word}, will retry on next run")
+
+
+def adopt_existing_outputs(index, previous, output_folder):
+    """Rename outputs saved under an older filename scheme instead of fetching them again.
+
+    A group's file may still be where the previous canonical_index.jsonl put
+    it, or at safe_word(entry) from before dedup (e.g. "Abate.json" for what
+    is now the key "abate").
+    """
+    folder = Path(output_folder)
+    current = {group["file"] + ".json" for group in index.values()}
+    for key, group in index.items():
+        out_path = output_path_for(group, output_folder)
         if out_path.exists():
-            print(f"✅ Skipping {word} (already exists)")
             continue
+        candidates = [previous.get(key)] + [safe_word(e) + ".json" for e in group["entries"]]
+        for name in dict.fromkeys(c for c in candidates if c):
+            # Never take a file that is some other word's current output
+            if name not in current and (folder / name).exists():
+                (folder / name).rename(out_path)
+                print(f"📦 Renamed {name} → {out_path.name}")
+                break
 
-        print(f"🔎 Fetching info for: {word}")
-        try:
-            result = fetch_word_info(word)
-
-            # Validate JSON before saving
-            try:
-                parsed = json.loads(result)
-            except json.JSONDecodeError:
-                print(f"⚠️ Warning: Gemini returned invalid JSON for {word}, saving raw text.")
-                parsed = {"word": word, "raw": result}
 
-            with open(out_path, "w", encoding="utf-8") as f:
-                json.dump(parsed, f, ensure_ascii=False, indent=2)
+def build_index(words, output_folder, lemmatize=False):
+    """Dedup deck entries into canonical words and record the entry -> file mapping.
 
-            print(f"💾 Saved {word} → {out_path}")
-        except Exception as e:
-            print(f"❌ Error fetching {word}: {e}")
+    Returns (index, previous), previous being the key -> file mapping of the
+    index this run replaced.
+    """
+    index, stats = build_canonical_index(words, lemmatize=lemmatize)
+    print_dedup_report(stats)
+    index_path = Path(output_folder) / "canonical_index.jsonl"
+    previous = read_index(index_path)
+    adopt_existing_outputs(index, previous, output_folder)
+    write_index(index, index_path)
+    return index, previous
+
+
+def sync_targets(apkg_path, output_folder, state_path=SYNC_STATE_DB, lemmatize=False):
+    """Return canonical roots to (re-)enrich since the last sync, pruning outputs of removed words."""
+    deck = Path(apkg_path).stem
+    first_sync = last_synced(state_path, deck) is None
+    changed, removed = sync_deck(apkg_path, state_path, deck)
+    index, previous = build_index(live_words(state_path, deck), output_folder, lemmatize)
+
+    live_files = {group["file"] + ".json" for group in index.values()}
+    removed_keys = {normalize_word(w) for w in removed} - index.keys()
+    for key in sorted(removed_keys):
+        # The file the previous index assigned, or the one output_stem gives now
+        for name in dict.fromkeys(filter(None, [previous.get(key), output_stem(key) + ".json"])):
+            out_path = Path(output_folder) / name
+            if name not in live_files and out_path.exists():
+                out_path.unlink()
+                print(f"🗑️ Pruned {key} (no longer in deck)")
+
+    root_of = {entry: root for root, group in index.items() for entry in group["entries"]}
+    # On a deck's first sync every note counts as new; outputs already on
+    # disk are kept, as in a non-sync run, instead of refetching the deck.
+    roots = set() if first_sync else {root_of[w] for w in changed if w in root_of}
+    print(f"Found {len(roots)} new or edited words in deck.")
+
+    # The sync state is saved before enrichment, so words whose fetch failed
+    # last run (and inflections freed by a removed base form) are only
+    # recognisable by their missing output file.
+    missing = {
+        root for root, group in index.items()
+        if root not in roots and not output_path_for(group, output_folder).exists()
+    }
+    if missing:
+        print(f"Found {len(missing)} more words with no saved output.")
+    return index, roots | missing
+
+
+def main(apkg_path, output_folder="output", batch=False, sync_state=None, lemmatize=False, embed_index=None):
+    Path(output_folder).mkdir(parents=True, exist_ok=True)
+    rec = recorder()
+
+    if sync_state:
+        # Edited notes are refreshed even if an output file already exists
+        with rec.stage("sync"), rec.profile("sync"):
+            index, roots = sync_targets(apkg_path, output_folder, sync_state, lemmatize)
+    else:
+        with rec.stage("extract"), rec.profile("extract"):
+            words = extract_sort_field_words(apkg_path)
+        print(f"Found {len(words)} words in deck.")
+        rec.count("deck.entries", len(words))
+        with rec.stage("dedup"), rec.profile("dedup"):
+            index, _ = build_index(words, output_folder, lemmatize)
+
+        roots = []
+        with rec.stage("cache_check"):
+            for root, group in index.items():
+                if output_path_for(group, output_folder).exists():
+                    print(f"✅ Skipping {group['word']} (already exists)")
+                    rec.count("output_cache.hit")
+                    continue
+                rec.count("output_cache.miss")
+                roots.append(root)
+
+    targets = {index[root]["word"]: output_path_for(index[root], output_folder) for root in roots}
+
+    with rec.stage("enrich"):
+        if batch:
+            if targets:
+                enrich_batch(targets, output_folder)
+        else:
+            for word, out_path in targets.items():
+                print(f"🔎 Fetching info for: {word}")
+                try:
+                    result = fetch_word_info(word)
+                    save_word_info(word, result, out_path)
+                except MissingAPIKeyError:
+                    raise
+                except Exception as e:
+                    rec.count("words.error")
+                    print(f"❌ Error fetching {word}: {e}")
+
+    if embed_index:
+        # numpy is only needed when the index is actually updated
+        from embeddingindex import INDEX_DIR, GeminiEmbedder, update_index
+
+        # Only new words and words whose text changed are embedded
+        index_dir = INDEX_DIR if embed_index is True else embed_index
+        with rec.stage("embed"):
+            update_index(output_folder, index_dir, GeminiEmbedder())
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python anki_definitions.py deck.apkg [output_folder]")
-        sys.exit(1)
-
-    apkg_path = sys.argv[1]
-    output_folder = sys.argv[2] if len(sys.argv) > 2 else "output"
-    main(apkg_path, output_folder)
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Enrich every word of an Anki deck with Gemini.")
+    parser.add_argument("apkg_path", help="deck.apkg")
+    parser.add_argument("output_folder", nargs="?", default="output")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="submit all missing words as a Gemini Batch job (cheaper, not interactive)",
+    )
+    parser.add_argument(
+        "--sync",
+        nargs="?",
+        const=SYNC_STATE_DB,
+        metavar="STATE_DB",
+        help="only process notes added/edited since the last sync and prune deleted ones",
+    )
+    parser.add_argument(
+        "--lemma",
+        action="store_true",
+        help="also fold inflected forms (\"abated\") into a base form in the deck",
+    )
+    parser.add_argument(
+        "--embed",
+        nargs="?",
+        const=True,
+        metavar="INDEX_DIR",
+        help="add newly enriched words to the similar-word embedding index",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PREFIX",
+        help="cProfile deck extraction and dedup, writing PREFIX.<stage>.prof",
+    )
+    args = parser.parse_args()
+    run = start_run("ankidefinitionperword", profile_path=args.profile)
+    try:
+        main(
+            args.apkg_path,
+            args.output_folder,
+            batch=args.batch,
+            sync_state=args.sync,
+            lemmatize=args.lemma,
+            embed_index=args.embed,
+        )
+    except MissingAPIKeyError as e:
+        sys.exit(f"Error: {e}")
+    finally:
+        # A crashed run still logs and prints what it got through
+        run.close()
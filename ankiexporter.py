@@ -0,0 +1,285 @@
+import hashlib
+import html
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+FIELDS = ["Word", "Definition", "Recent Usage", "Etymology", "Synonyms", "Antonyms", "Audio"]
+JSON_KEYS = ["word", "definition", "recent_usage", "etymology", "synonyms", "antonyms"]
+
+SCHEMA = """
+CREATE TABLE col (
+    id integer primary key, crt integer not null, mod integer not null,
+    scm integer not null, ver integer not null, dty integer not null,
+    usn integer not null, ls integer not null, conf text not null,
+    models text not null, decks text not null, dconf text not null,
+    tags text not null
+);
+CREATE TABLE notes (
+    id integer primary key, guid text not null, mid integer not null,
+    mod integer not null, usn integer not null, tags text not null,
+    flds text not null, sfld integer not null, csum integer not null,
+    flags integer not null, data text not null
+);
+CREATE TABLE cards (
+    id integer primary key, nid integer not null, did integer not null,
+    ord integer not null, mod integer not null, usn integer not null,
+    type integer not null, queue integer not null, due integer not null,
+    ivl integer not null, factor integer not null, reps integer not null,
+    lapses integer not null, left integer not null, odue integer not null,
+    odid integer not null, flags integer not null, data text not null
+);
+CREATE TABLE revlog (
+    id integer primary key, cid integer not null, usn integer not null,
+    ease integer not null, ivl integer not null, lastIvl integer not null,
+    factor integer not null, time integer not null, type integer not null
+);
+CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+"""
+
+# Created after the bulk insert so rows are not indexed one at a time
+INDEXES = """
+CREATE INDEX ix_notes_usn ON notes (usn);
+CREATE INDEX ix_cards_usn ON cards (usn);
+CREATE INDEX ix_revlog_usn ON revlog (usn);
+CREATE INDEX ix_cards_nid ON cards (nid);
+CREATE INDEX ix_cards_sched ON cards (did, queue, due);
+CREATE INDEX ix_revlog_cid ON revlog (cid);
+CREATE INDEX ix_notes_csum ON notes (csum);
+"""
+
+CARD_CSS = """.card {
+  font-family: arial;
+  font-size: 20px;
+  text-align: left;
+  color: black;
+  background-color: white;
+}
+.label { font-weight: bold; }"""
+
+ANSWER_TEMPLATE = """{{FrontSide}}
+<hr id=answer>
+<div><span class=label>Definition:</span> {{Definition}}</div>
+<div><span class=label>Recent Usage:</span> {{Recent Usage}}</div>
+<div><span class=label>Etymology:</span> {{Etymology}}</div>
+<div><span class=label>Synonyms:</span> {{Synonyms}}</div>
+<div><span class=label>Antonyms:</span> {{Antonyms}}</div>
+{{Audio}}"""
+
+
+def _id_from(name: str) -> int:
+    """Stable 13-digit id (Anki ids are epoch milliseconds) derived from a name."""
+    return 1_000_000_000_000 + int(hashlib.sha1(name.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def field_checksum(text: str) -> int:
+    """Anki's csum: first 8 hex digits of the SHA1 of the sort field."""
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def build_models(model_id, deck_id, now):
+    model = {
+        "id": model_id,
+        "name": "Vocabulary (enriched)",
+        "type": 0,
+        "mod": now,
+        "usn": -1,
+        "sortf": 0,
+        "did": deck_id,
+        "tmpls": [
+            {
+                "name": "Card 1",
+                "ord": 0,
+                "qfmt": "{{Word}}",
+                "afmt": ANSWER_TEMPLATE,
+                "did": None,
+                "bqfmt": "",
+                "bafmt": "",
+            }
+        ],
+        "flds": [
+            {"name": name, "ord": i, "sticky": False, "rtl": False, "font": "Arial", "size": 20, "media": []}
+            for i, name in enumerate(FIELDS)
+        ],
+        "css": CARD_CSS,
+        "latexPre": "\\documentclass[12pt]{article}\n\\special{papersize=3in,5in}\n"
+        "\\usepackage[utf8]{inputenc}\n\\usepackage{amssymb,amsmath}\n"
+        "\\pagestyle{empty}\n\\setlength{\\parindent}{0in}\n\\begin{document}\n",
+        "latexPost": "\\end{document}",
+        "tags": [],
+        "vers": [],
+        "req": [[0, "any", [0]]],
+    }
+    return {str(model_id): model}
+
+
+def build_decks(deck_id, deck_name, now):
+    def deck(did, name):
+        return {
+            "id": did,
+            "name": name,
+            "mod": now,
+            "usn": -1,
+            "desc": "",
+            "dyn": 0,
+            "conf": 1,
+            "collapsed": False,
+            "extendNew": 10,
+            "extendRev": 50,
+            "newToday": [0, 0],
+            "revToday": [0, 0],
+            "lrnToday": [0, 0],
+            "timeToday": [0, 0],
+        }
+
+    return {"1": deck(1, "Default"), str(deck_id): deck(deck_id, deck_name)}
+
+
+def build_dconf():
+    return {
+        "1": {
+            "id": 1,
+            "name": "Default",
+            "mod": 0,
+            "usn": 0,
+            "maxTaken": 60,
+            "autoplay": True,
+            "timer": 0,
+            "replayq": True,
+            "dyn": False,
+            "new": {
+                "delays": [1, 10],
+                "ints": [1, 4, 7],
+                "initialFactor": 2500,
+                "order": 1,
+                "perDay": 20,
+                "bury": True,
+                "separate": True,
+            },
+            "rev": {"perDay": 100, "ease4": 1.3, "fuzz": 0.05, "ivlFct": 1, "maxIvl": 36500, "bury": True},
+            "lapse": {"delays": [10], "mult": 0, "minInt": 1, "leechFails": 8, "leechAction": 0},
+        }
+    }
+
+
+def format_field(value) -> str:
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value)
+    return html.escape(str(value or ""))
+
+
+def iter_entries(json_folder):
+    """Yield (stem, entry) for every enriched JSON file, one file at a time."""
+    with os.scandir(json_folder) as it:
+        for dirent in it:
+            if not dirent.name.endswith(".json") or not dirent.is_file():
+                continue
+            with open(dirent.path, "r", encoding="utf-8") as f:
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError:
+                    print(f"⚠️ Skipping invalid JSON file: {dirent.path}")
+                    continue
+            if not data.get("word") or "raw" in data:
+                print(f"⚠️ Skipping unrepaired entry: {dirent.path}")
+                continue
+            yield dirent.name[: -len(".json")], data
+
+
+def export_apkg(json_folder, apkg_path, deck_name="Vocabulary", audio_folder=None):
+    """Build an .apkg from enriched JSON files (and optional <stem>.mp3 audio).
+
+    Notes are streamed from disk straight into a single executemany inside
+    one transaction, cards are derived from notes in SQL, and the zip is
+    written file by file, so memory stays flat regardless of deck size.
+    Returns the number of notes exported.
+    """
+    now = int(time.time())
+    deck_id = _id_from("deck:" + deck_name)
+    model_id = _id_from("model:" + deck_name)
+    media = {}  # zip member name -> media filename
+
+    def note_rows():
+        base_id = now * 1000
+        for i, (stem, data) in enumerate(iter_entries(json_folder)):
+            values = [format_field(data.get(k)) for k in JSON_KEYS]
+            audio = ""
+            if audio_folder:
+                audio_name = f"{stem}.mp3"
+                if os.path.exists(os.path.join(audio_folder, audio_name)):
+                    media[str(len(media))] = audio_name
+                    audio = f"[sound:{audio_name}]"
+            values.append(audio)
+            word = data["word"]
+            guid = hashlib.sha1(f"{deck_name}:{word}".encode("utf-8")).hexdigest()[:10]
+            yield (
+                base_id + i, guid, model_id, now, -1, "",
+                "\x1f".join(values), word, field_checksum(word), 0, "",
+            )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "collection.anki2")
+        conn = sqlite3.connect(db_path)
+        # Throwaway file: skip the rollback journal and fsyncs
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+
+        with conn:
+            conn.execute(
+                "INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, '{}')",
+                (
+                    now,
+                    now * 1000,
+                    now * 1000,
+                    json.dumps({"curDeck": deck_id, "curModel": str(model_id), "nextPos": 1}),
+                    json.dumps(build_models(model_id, deck_id, now)),
+                    json.dumps(build_decks(deck_id, deck_name, now)),
+                    json.dumps(build_dconf()),
+                ),
+            )
+            conn.executemany("INSERT INTO notes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", note_rows())
+            # One new card per note; due = position in the new queue
+            conn.execute(
+                """
+                INSERT INTO cards
+                SELECT id, id, ?, 0, mod, -1, 0, 0, ROW_NUMBER() OVER (ORDER BY id),
+                       0, 0, 0, 0, 0, 0, 0, 0, ''
+                FROM notes
+                """,
+                (deck_id,),
+            )
+            count = conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+            conn.executescript(INDEXES)
+        conn.close()
+
+        with zipfile.ZipFile(apkg_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+            z.write(db_path, "collection.anki2")
+            for member, audio_name in media.items():
+                # Audio is already compressed
+                z.write(os.path.join(audio_folder, audio_name), member, compress_type=zipfile.ZIP_STORED)
+            z.writestr("media", json.dumps(media))
+
+    print(f"📦 Exported {count} notes ({len(media)} audio files) to {apkg_path}")
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export enriched word JSON files as an Anki .apkg deck.")
+    parser.add_argument("json_folder", help="folder of enriched <word>.json files")
+    parser.add_argument("apkg_path", help="deck.apkg to write")
+    parser.add_argument("--deck-name", default="Vocabulary")
+    parser.add_argument("--audio", metavar="DIR", help="folder of pre-rendered <word>.mp3 files to bundle")
+    args = parser.parse_args()
+
+    if not Path(args.json_folder).is_dir():
+        print(f"Error: {args.json_folder} is not a folder.")
+        sys.exit(1)
+    export_apkg(args.json_folder, args.apkg_path, args.deck_name, args.audio)
@@ -3,9 +3,142 @@ import json
 import zipfile
 import sys
 import os
+import csv
+import struct
+from array import array
 
+# Compact columnar format: a magic header, then one block per run of rows
+# with the same note type. Each block stores the note type once, then the
+# note ids as int64, the value end offsets as uint32 and the UTF-8 values
+# back to back, all little-endian.
+COLUMNAR_MAGIC = b"SFC1"
+COLUMNAR_BLOCK_ROWS = 65536
+
+FORMATS = {".txt": "text", ".jsonl": "jsonl", ".csv": "csv", ".sfc": "columnar"}
+
+
+class TextWriter:
+    """The original human-readable report, one section per note type."""
+
+    def __init__(self, f):
+        self.f = f
+        self.model_name = None
+
+    def write(self, note_id, model_name, sort_value):
+        if model_name != self.model_name:
+            if self.model_name is not None:
+                self.f.write("\n")
+            self.f.write(f"Note Type: {model_name}\n")
+            self.f.write("Sort Field Values:\n")
+            self.model_name = model_name
+        self.f.write(f"  - {sort_value}\n")
+
+    def close(self):
+        if self.model_name is not None:
+            self.f.write("\n")
+
+
+class JsonlWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, note_id, model_name, sort_value):
+        self.f.write(json.dumps(
+            {"note_id": note_id, "note_type": model_name, "sort_value": sort_value},
+            ensure_ascii=False,
+        ) + "\n")
+
+    def close(self):
+        pass
+
+
+class CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.writer(f)
+        self.writer.writerow(["note_id", "note_type", "sort_value"])
+
+    def write(self, note_id, model_name, sort_value):
+        self.writer.writerow([note_id, model_name, sort_value])
+
+    def close(self):
+        pass
+
+
+class ColumnarWriter:
+    """Buffers at most COLUMNAR_BLOCK_ROWS rows, then flushes them as one block."""
+
+    def __init__(self, f):
+        self.f = f
+        self.f.write(COLUMNAR_MAGIC)
+        self.model_name = None
+        self.ids = array("q")
+        self.ends = array("I")
+        self.blob = bytearray()
+
+    def write(self, note_id, model_name, sort_value):
+        if model_name != self.model_name or len(self.ids) >= COLUMNAR_BLOCK_ROWS:
+            self.flush()
+            self.model_name = model_name
+        self.ids.append(note_id)
+        self.blob += sort_value.encode("utf-8")
+        self.ends.append(len(self.blob))
+
+    def flush(self):
+        if not self.ids:
+            return
+        ids, ends = self.ids, self.ends
+        if sys.byteorder != "little":
+            ids, ends = array("q", ids), array("I", ends)
+            ids.byteswap()
+            ends.byteswap()
+        name = self.model_name.encode("utf-8")
+        self.f.write(struct.pack("<IH", len(self.ids), len(name)))
+        self.f.write(name)
+        self.f.write(struct.pack("<I", len(self.blob)))
+        self.f.write(ids.tobytes())
+        self.f.write(ends.tobytes())
+        self.f.write(self.blob)
+        self.ids, self.ends, self.blob = array("q"), array("I"), bytearray()
+
+    def close(self):
+        self.flush()
+
+
+def read_columnar(path):
+    """Yield (model_name, note_ids, sort_values) blocks from a columnar file."""
+    with open(path, "rb") as f:
+        if f.read(4) != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a sort field columnar file")
+        while True:
+            header = f.read(6)
+            if not header:
+                return
+            count, name_len = struct.unpack("<IH", header)
+            model_name = f.read(name_len).decode("utf-8")
+            (blob_len,) = struct.unpack("<I", f.read(4))
+            ids = array("q")
+            ids.frombytes(f.read(8 * count))
+            ends = array("I")
+            ends.frombytes(f.read(4 * count))
+            if sys.byteorder != "little":
+                ids.byteswap()
+                ends.byteswap()
+            blob = f.read(blob_len)
+            values, start = [], 0
+            for end in ends:
+                values.append(blob[start:end].decode("utf-8"))
+                start = end
+            yield model_name, ids, values
+
+
+WRITERS = {"text": TextWriter, "jsonl": JsonlWriter, "csv": CsvWriter, "columnar": ColumnarWriter}
+
+
+def extract_sort_field_content(apkg_path, output_file, fmt=None):
+    fmt = fmt or FORMATS.get(os.path.splitext(output_file)[1].lower(), "text")
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown output format: {fmt}")
 
-def extract_sort_field_content(apkg_path, output_file):
     # Step 1: Extract collection.anki2 from the apkg (it's a zip file)
     with zipfile.ZipFile(apkg_path, "r") as z:
         if "collection.anki2" not in z.namelist():
@@ -24,41 +157,39 @@ def extract_sort_field_content(apkg_path, output_file):
 
     models = json.loads(row[0])
 
-    # Step 4: Get all notes
-    cursor.execute("SELECT id, mid, flds FROM notes")
-    notes = cursor.fetchall()
-
-    # Step 5: Map model_id -> (model_name, sort_field_index, field_names)
-    model_info = {}
-    for model_id, model in models.items():
-        model_name = model.get("name", f"Model_{model_id}")
-        sort_field_index = model.get("sortf", 0)
-        fields = [fld.get("name", "Unknown") for fld in model.get("flds", [])]
-        model_info[int(model_id)] = (model_name, sort_field_index, fields)
-
-    # Step 6: Extract sort field content
-    results = {}
-    for note_id, mid, flds in notes:
-        if mid not in model_info:
-            continue
-        model_name, sort_field_index, fields = model_info[mid]
-        field_values = flds.split("\x1f")  # fields are separated by 0x1F
-        if 0 <= sort_field_index < len(field_values):
-            sort_value = field_values[sort_field_index]
-        else:
-            sort_value = ""
-        results.setdefault(model_name, []).append(sort_value)
+    # Step 4: Load model_id -> (model_name, sort_field_index) into a temp table
+    # so notes can be grouped by note type in SQL instead of in memory
+    cursor.execute("CREATE TEMP TABLE models (mid INTEGER PRIMARY KEY, name TEXT, sortf INTEGER)")
+    cursor.executemany(
+        "INSERT INTO temp.models VALUES (?, ?, ?)",
+        [
+            (int(model_id), model.get("name", f"Model_{model_id}"), model.get("sortf", 0))
+            for model_id, model in models.items()
+        ],
+    )
 
-    conn.close()
+    # Step 5: Stream notes ordered by note type and write each sort value
+    cursor.execute(
+        """
+        SELECT n.id, m.name, m.sortf, n.flds
+        FROM notes n JOIN temp.models m ON m.mid = n.mid
+        ORDER BY m.name, n.id
+        """
+    )
+    newline = "" if fmt == "csv" else None
+    mode, encoding = ("wb", None) if fmt == "columnar" else ("w", "utf-8")
+    with open(output_file, mode, encoding=encoding, newline=newline) as f:
+        writer = WRITERS[fmt](f)
+        for note_id, model_name, sort_field_index, flds in cursor:
+            field_values = flds.split("\x1f")  # fields are separated by 0x1F
+            if 0 <= sort_field_index < len(field_values):
+                sort_value = field_values[sort_field_index]
+            else:
+                sort_value = ""
+            writer.write(note_id, model_name, sort_value)
+        writer.close()
 
-    # Step 7: Save results to file
-    with open(output_file, "w", encoding="utf-8") as f:
-        for model_name, values in results.items():
-            f.write(f"Note Type: {model_name}\n")
-            f.write("Sort Field Values:\n")
-            for v in values:
-                f.write(f"  - {v}\n")
-            f.write("\n")
+    conn.close()
 
     # Clean up extracted DB
     os.remove("collection.anki2")
@@ -67,10 +198,11 @@ def extract_sort_field_content(apkg_path, output_file):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python extract_sort_field_content.py deck.apkg output.txt")
-        sys.exit(1)
+    import argparse
 
-    apkg_path = sys.argv[1]
-    output_file = sys.argv[2]
-    extract_sort_field_content(apkg_path, output_file)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract sort field values from an Anki deck.")
+    parser.add_argument("apkg_path", help="deck.apkg")
+    parser.add_argument("output_file", help="output file; format is picked from .txt/.jsonl/.csv/.sfc")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="override the output format")
+    args = parser.parse_args()
+    extract_sort_field_content(args.apkg_path, args.output_file, args.format)
@@ -1,321 +0,0 @@
-import os
-import shutil
-
-# List of JSON filenames
-files = [
-    "abject.json",
-    "aberration.json",
-    "abjure.json",
-    "abnegation.json",
-    "abrogate.json",
-    "abscond.json",
-    "abstruse.json",
-    "accede.json",
-    "accost.json",
-    "accretion.json",
-    "acumen.json",
-    "adamant.json",
-    "admonish.json",
-    "adumbrate.json",
-    "adverse.json",
-    "advocate.json",
-    "affluent.json",
-    "aggrandize.json",
-    "alacrity.json",
-    "alias.json",
-    "ambivalent.json",
-    "amenable.json",
-    "amorphous.json",
-    "anachronistic.json",
-    "anathema.json",
-    "annex.json",
-    "antediluvian.json",
-    "antiseptic.json",
-    "apathetic.json",
-    "antithesis.json",
-    "apocryphal.json",
-    "approbation.json",
-    "arbitrary.json",
-    "arboreal.json",
-    "arcane.json",
-    "archetypal.json",
-    "arrogate.json",
-    "ascetic.json",
-    "aspersion.json",
-    "assiduous.json",
-    "atrophy.json",
-    "bane.json",
-    "bashful.json",
-    "beguile.json",
-    "bereft.json",
-    "blandishment.json",
-    "bilk.json",
-    "bombastic.json",
-    "cajole.json",
-    "callous.json",
-    "calumny.json",
-    "camaraderie.json",
-    "candor.json",
-    "capitulate.json",
-    "carouse.json",
-    "carp.json",
-    "caucus.json",
-    "cavort.json",
-    "circumlocution.json",
-    "circumscribe.json",
-    "circumvent.json",
-    "clamor.json",
-    "cleave.json",
-    "cobbler.json",
-    "cogent.json",
-    "cognizant.json",
-    "commensurate.json",
-    "complement.json",
-    "compunction.json",
-    "concomitant.json",
-    "conduit.json",
-    "conflagration.json",
-    "congruity.json",
-    "connive.json",
-    "consign.json",
-    "constituent.json",
-    "construe.json",
-    "contusion.json",
-    "contrite.json",
-    "contentious.json",
-    "contravene.json",
-    "convivial.json",
-    "corpulence.json",
-    "covet.json",
-    "cupidity.json",
-    "dearth.json",
-    "debacle.json",
-    "debauch.json",
-    "debunk.json",
-    "defunct.json",
-    "demagogue.json",
-    "denigrate.json",
-    "derivative.json",
-    "despot.json",
-    "diaphanous.json",
-    "didactic.json",
-    "dirge.json",
-    "disaffected.json",
-    "discomfit.json",
-    "disparate.json",
-    "dispel.json",
-    "disrepute.json",
-    "divisive.json",
-    "dogmatic.json",
-    "dour.json",
-    "duplicity.json",
-    "duress.json",
-    "eclectic.json",
-    "edict.json",
-    "ebullient.json",
-    "egregious.json",
-    "elegy.json",
-    "elicit.json",
-    "embezzlement.json",
-    "emend.json",
-    "emollient.json",
-    "empirical.json",
-    "emulate.json",
-    "enervate.json",
-    "enfranchise.json",
-    "engender.json",
-    "ephemeral.json",
-    "epistolary.json",
-    "equanimity.json",
-    "equivocal.json",
-    "espouse.json",
-    "evanescent.json",
-    "evince.json",
-    "exacerbate.json",
-    "exhort.json",
-    "execrable.json",
-    "exigent.json",
-    "expedient.json",
-    "expiate.json",
-    "expunge.json",
-    "extraneous.json",
-    "extol.json",
-    "extant.json",
-    "expurgate.json",
-    "fallacious.json",
-    "fatuous.json",
-    "fetter.json",
-    "flagrant.json",
-    "foil.json",
-    "forbearance.json",
-    "fortuitous.json",
-    "fractious.json",
-    "garrulous.json",
-    "gourmand.json",
-    "grandiloquent.json",
-    "gratuitous.json",
-    "hapless.json",
-    "hegemony.json",
-    "heterogenous.json",
-    "iconoclast.json",
-    "idiosyncratic.json",
-    "impecunious.json",
-    "impetuous.json",
-    "impinge.json",
-    "impute.json",
-    "inane.json",
-    "inchoate.json",
-    "incontrovertible.json",
-    "incumbent.json",
-    "inexorable.json",
-    "inimical.json",
-    "injunction.json",
-    "inoculate.json",
-    "insidious.json",
-    "instigate.json",
-    "insurgent.json",
-    "interlocutor.json",
-    "intimation.json",
-    "inure.json",
-    "invective.json",
-    "intransigent.json",
-    "inveterate.json",
-    "irreverence.json",
-    "knell.json",
-    "laconic.json",
-    "largesse.json",
-    "legerdemain.json",
-    "libertarian.json",
-    "licentious.json",
-    "linchpin.json",
-    "litigant.json",
-    "maelstrom.json",
-    "maudlin.json",
-    "maverick.json",
-    "mawkish.json",
-    "maxim.json",
-    "mendacious.json",
-    "modicum.json",
-    "morass.json",
-    "mores.json",
-    "munificent.json",
-    "multifarious.json",
-    "nadir.json",
-    "negligent.json",
-    "neophyte.json",
-    "noisome.json",
-    "noxious.json",
-    "obdurate.json",
-    "obfuscate.json",
-    "obstreperous.json",
-    "officious.json",
-    "onerous.json",
-    "ostensible.json",
-    "ostracism.json",
-    "palliate.json",
-    "panacea.json",
-    "paradigm.json",
-    "pariah.json",
-    "partisan.json",
-    "paucity.json",
-    "pejorative.json",
-    "pellucid.json",
-    "penchant.json",
-    "penurious.json",
-    "pert.json",
-    "pernicious.json",
-    "pertinacious.json",
-    "phlegmatic.json",
-    "philanthropic.json",
-    "pithy.json",
-    "platitude.json",
-    "plaudit.json",
-    "plenitude.json",
-    "plethora.json",
-    "portent.json",
-    "potentate.json",
-    "preclude.json",
-    "predilection.json",
-    "preponderance.json",
-    "presage.json",
-    "probity.json",
-    "proclivity.json",
-    "profligate.json",
-    "promulgate.json",
-    "proscribe.json",
-    "protean.json",
-    "prurient.json",
-    "puerile.json",
-    "pugnacious.json",
-    "pulchritude.json",
-    "punctilious.json",
-    "quaint.json",
-    "quixotic.json",
-    "quandary.json",
-    "recalcitrant.json",
-    "redoubtable.json",
-    "relegate.json",
-    "remiss.json",
-    "reprieve.json",
-    "reprobate.json",
-    "rescind.json",
-    "requisition.json",
-    "rife.json",
-    "sanctimonious.json",
-    "sanguine.json",
-    "scurrilous.json",
-    "semaphore.json",
-    "serendipity.json",
-    "sobriety.json",
-    "solicitous.json",
-    "solipsism.json",
-    "spurious.json",
-    "staid.json",
-    "stolid.json",
-    "subjugate.json",
-    "surfeit.json",
-    "surreptitious.json",
-    "swarthy.json",
-    "tangential.json",
-    "tome.json",
-    "toady.json",
-    "torpid.json",
-    "travesty.json",
-    "trenchant.json",
-    "trite.json",
-    "truculent.json",
-    "turpitude.json",
-    "ubiquitous.json",
-    "umbrage.json",
-    "upbraid.json",
-    "utilitarian.json",
-    "veracity.json",
-    "vestige.json",
-    "vicissitude.json",
-    "vilify.json",
-    "virtuoso.json",
-    "vitriolic.json",
-    "vituperate.json",
-    "vociferous.json",
-    "wanton.json",
-    "winsome.json",
-    "yoke.json",
-    "zephyr.json",
-    "wily.json",
-    "tirade.json",
-]
-
-# Destination folder
-dest_folder = "vocab_json"
-
-# Ensure new folder exists
-os.makedirs(dest_folder, exist_ok=True)
-
-# Copy files into destination
-for f in files:
-    f_source = "output\\" + f
-    if os.path.exists(f_source):
-        shutil.copy(f_source, os.path.join(dest_folder, f))
-        # print(f"Copied {f} to {dest_folder}/")
-    else:
-        print(f"Warning: {f} not found, skipped.")
\ No newline at end of file
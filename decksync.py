@@ -0,0 +1,247 @@
+import html
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+SYNC_STATE_DB = "sync_state.db"
+
+
+def clean_field_value(value: str) -> str:
+    """Clean Anki field value: remove HTML tags, decode entities, strip spaces."""
+    # Decode HTML entities (&nbsp;, &amp;, etc.)
+    value = html.unescape(value)
+    # Remove HTML tags like <br>, <div>, etc.
+    value = re.sub(r"<[^>]+>", " ", value)
+    # Collapse multiple spaces
+    value = re.sub(r"\s+", " ", value)
+    return value.strip()
+
+
+def extract_sort_field_words(apkg_path):
+    """Extract all sort field values (words) from an Anki .apkg deck."""
+    with zipfile.ZipFile(apkg_path, "r") as z:
+        if "collection.anki2" not in z.namelist():
+            raise FileNotFoundError("collection.anki2 not found in the .apkg file")
+        z.extract("collection.anki2", path=".")
+
+    conn = sqlite3.connect("collection.anki2")
+    cursor = conn.cursor()
+
+    # Load models
+    cursor.execute("SELECT models FROM col")
+    row = cursor.fetchone()
+    if not row:
+        raise ValueError("No models found in collection.anki2")
+    models = json.loads(row[0])
+
+    # Map model_id -> sort field index
+    model_info = {}
+    for model_id, model in models.items():
+        sort_field_index = model.get("sortf", 0)
+        model_info[int(model_id)] = sort_field_index
+
+    # Extract notes
+    cursor.execute("SELECT mid, flds FROM notes")
+    notes = cursor.fetchall()
+
+    words = []
+    for mid, flds in notes:
+        if mid not in model_info:
+            continue
+        sort_field_index = model_info[mid]
+        field_values = flds.split("\x1f")
+        if 0 <= sort_field_index < len(field_values):
+            raw_word = field_values[sort_field_index]
+            word = clean_field_value(raw_word)
+            if word:
+                words.append(word)
+
+    conn.close()
+    os.remove("collection.anki2")
+    return words
+
+
+def init_state_db(conn):
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS deck_state (
+            deck TEXT PRIMARY KEY,
+            last_mod INTEGER NOT NULL,
+            last_usn INTEGER NOT NULL,
+            synced_at INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS deck_notes (
+            deck TEXT NOT NULL,
+            note_id INTEGER NOT NULL,
+            word TEXT NOT NULL,
+            mod INTEGER NOT NULL,
+            usn INTEGER NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (deck, note_id)
+        );
+        CREATE INDEX IF NOT EXISTS deck_notes_word ON deck_notes (deck, word, deleted);
+        """
+    )
+
+
+def sync_deck(apkg_path, state_path=SYNC_STATE_DB, deck=None):
+    """Sync one deck against the stored state, reading only notes changed since last run.
+
+    Notes are selected with notes.mod/usn at or above the last-seen values, so
+    an unchanged deck costs one indexed pass over note ids (to detect
+    deletions) and writes nothing. Returns (changed, removed):
+    changed -- words that are new or whose sort field changed; re-enrich these
+    removed -- words no longer held by any live note; their notes are tombstoned
+    """
+    deck = deck or Path(apkg_path).stem
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with zipfile.ZipFile(apkg_path, "r") as z:
+            if "collection.anki2" not in z.namelist():
+                raise FileNotFoundError("collection.anki2 not found in the .apkg file")
+            z.extract("collection.anki2", path=tmp)
+
+        state = sqlite3.connect(state_path)
+        init_state_db(state)
+        state.close()
+
+        conn = sqlite3.connect(os.path.join(tmp, "collection.anki2"))
+        try:
+            conn.execute("ATTACH DATABASE ? AS state", (str(state_path),))
+            return _sync(conn, deck)
+        finally:
+            conn.close()
+
+
+def _sync(conn, deck):
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT models FROM col")
+    row = cursor.fetchone()
+    if not row:
+        raise ValueError("No models found in collection.anki2")
+    model_info = {int(mid): m.get("sortf", 0) for mid, m in json.loads(row[0]).items()}
+
+    cursor.execute("SELECT last_mod, last_usn FROM state.deck_state WHERE deck = ?", (deck,))
+    last_mod, last_usn = cursor.fetchone() or (0, -1)
+
+    # >= on mod: an edit in the same second as the last sync must not be missed;
+    # the join drops notes we have already seen at that exact mod.
+    cursor.execute(
+        """
+        SELECT n.id, n.mid, n.mod, n.usn, n.flds, s.word, s.deleted
+        FROM notes n
+        LEFT JOIN state.deck_notes s ON s.deck = ? AND s.note_id = n.id
+        WHERE (n.mod >= ? OR n.usn > ?)
+          AND (s.note_id IS NULL OR s.mod != n.mod OR s.deleted = 1)
+        """,
+        (deck, last_mod, last_usn),
+    )
+    updates = []
+    changed = []
+    stale = set()  # words that may have lost their last note
+    max_mod, max_usn = last_mod, last_usn
+    for note_id, mid, mod, usn, flds, old_word, deleted in cursor.fetchall():
+        max_mod, max_usn = max(max_mod, mod), max(max_usn, usn)
+        sort_field_index = model_info.get(mid)
+        if sort_field_index is None:
+            continue
+        field_values = flds.split("\x1f")
+        word = ""
+        if 0 <= sort_field_index < len(field_values):
+            word = clean_field_value(field_values[sort_field_index])
+        if old_word is not None and old_word != word:
+            stale.add(old_word)
+        if word and (word != old_word or deleted):
+            changed.append(word)
+        updates.append((deck, note_id, word, mod, usn))
+
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO state.deck_notes (deck, note_id, word, mod, usn, deleted)
+            VALUES (?, ?, ?, ?, ?, 0)
+            ON CONFLICT (deck, note_id) DO UPDATE SET
+                word = excluded.word, mod = excluded.mod, usn = excluded.usn, deleted = 0
+            """,
+            updates,
+        )
+
+        # Tombstone notes that disappeared from the deck
+        cursor.execute(
+            """
+            SELECT note_id, word FROM state.deck_notes
+            WHERE deck = ? AND deleted = 0 AND note_id NOT IN (SELECT id FROM main.notes)
+            """,
+            (deck,),
+        )
+        gone = cursor.fetchall()
+        conn.executemany(
+            "UPDATE state.deck_notes SET deleted = 1 WHERE deck = ? AND note_id = ?",
+            [(deck, note_id) for note_id, _ in gone],
+        )
+        stale.update(word for _, word in gone)
+
+        removed = []
+        for word in sorted(stale):
+            cursor.execute(
+                "SELECT 1 FROM state.deck_notes WHERE deck = ? AND word = ? AND deleted = 0 LIMIT 1",
+                (deck, word),
+            )
+            if word and cursor.fetchone() is None:
+                removed.append(word)
+
+        conn.execute(
+            """
+            INSERT INTO state.deck_state (deck, last_mod, last_usn, synced_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (deck) DO UPDATE SET
+                last_mod = excluded.last_mod, last_usn = excluded.last_usn,
+                synced_at = excluded.synced_at
+            """,
+            (deck, max_mod, max_usn, int(time.time())),
+        )
+
+    print(f"🔁 Synced {deck}: {len(updates)} notes touched, {len(gone)} tombstoned")
+    return list(dict.fromkeys(changed)), removed
+
+
+def last_synced(state_path, deck):
+    """Unix time of deck's last sync, or None if it has never been synced."""
+    if not os.path.exists(state_path):
+        return None
+    conn = sqlite3.connect(state_path)
+    try:
+        init_state_db(conn)
+        row = conn.execute("SELECT synced_at FROM deck_state WHERE deck = ?", (deck,)).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def live_words(state_path, deck):
+    """Sort-field words of every live (non-tombstoned) note recorded for deck."""
+    conn = sqlite3.connect(state_path)
+    try:
+        rows = conn.execute(
+            "SELECT word FROM deck_notes WHERE deck = ? AND deleted = 0 AND word != '' ORDER BY note_id",
+            (deck,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [word for (word,) in rows]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python decksync.py deck.apkg [sync_state.db]")
+        sys.exit(1)
+
+    changed, removed = sync_deck(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else SYNC_STATE_DB)
+    print(f"Changed: {len(changed)} words, removed: {len(removed)} words")
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+INDEX_DIR = "embedding_index"
+VECTORS_FILE = "vectors.f32"
+META_FILE = "words.json"
+
+
+class GeminiEmbedder:
+    """Embeds texts with the Gemini embedding model through a genai.Client."""
+
+    batch_size = 100
+
+    def __init__(self, client=None, model="gemini-embedding-001", dim=768):
+        self.client = client
+        self.model = model
+        self.dim = dim
+        self.name = f"{model}-{dim}"
+
+    def embed(self, texts):
+        from google.genai.types import EmbedContentConfig
+
+        if self.client is None:
+            from geminiclient import get_client
+
+            self.client = get_client()
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            result = self.client.models.embed_content(
+                model=self.model,
+                contents=texts[start : start + self.batch_size],
+                config=EmbedContentConfig(
+                    task_type="SEMANTIC_SIMILARITY", output_dimensionality=self.dim
+                ),
+            )
+            rows.extend(e.values for e in result.embeddings)
+        return np.asarray(rows, dtype=np.float32).reshape(len(texts), self.dim)
+
+
+class HashingEmbedder:
+    """Local stand-in: hashed character trigrams and words. No network, deterministic."""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            text = text.casefold()
+            padded = f" {text} "
+            features = [padded[i : i + 3] for i in range(len(padded) - 2)] + text.split()
+            for feature in features:
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                out[row, bucket] += sign
+        return out
+
+
+def entry_text(entry):
+    """Text embedded for one enriched word: the word plus its definition."""
+    return f"{entry.get('word', '')}: {entry.get('definition', '')}".strip()
+
+
+def text_digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+# One loaded version of the index. reload() builds a new one and swaps it in
+# with a single assignment, so a query never mixes words from one version
+# with the vectors of another.
+Snapshot = namedtuple("Snapshot", "words positions digests vectors meta_mtime")
+EMPTY_SNAPSHOT = Snapshot([], {}, [], None, None)
+
+
+class EmbeddingIndex:
+    """Word vectors kept on disk as an (n, dim) float32 matrix, memory-mapped for queries.
+
+    Rows are L2-normalized on insert, so cosine similarity is a single
+    matrix-vector product. New words are appended to the end of the
+    file; a word whose text changed has its row overwritten in place.
+    """
+
+    def __init__(self, index_dir=INDEX_DIR, embedder=None):
+        self.index_dir = Path(index_dir)
+        self.embedder = embedder
+        self.dim = embedder.dim if embedder else None
+        self.embedder_name = embedder.name if embedder else None
+        self.snapshot = EMPTY_SNAPSHOT
+        self.reload()
+
+    @property
+    def words(self):
+        return self.snapshot.words
+
+    @property
+    def positions(self):
+        return self.snapshot.positions
+
+    @property
+    def digests(self):
+        return self.snapshot.digests
+
+    @property
+    def vectors(self):
+        return self.snapshot.vectors
+
+    def reload(self):
+        meta_path = self.index_dir / META_FILE
+        if not meta_path.exists():
+            return
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if self.embedder and meta["embedder"] != self.embedder.name:
+            raise ValueError(
+                f"Index at {self.index_dir} was built with {meta['embedder']}, not {self.embedder.name}"
+            )
+        words = meta["words"]
+        vectors = None
+        if words:
+            vectors = np.memmap(
+                self.index_dir / VECTORS_FILE, dtype=np.float32, mode="r", shape=(len(words), meta["dim"])
+            )
+        self.dim = meta["dim"]
+        self.embedder_name = meta["embedder"]
+        self.snapshot = Snapshot(
+            words=words,
+            positions={w: i for i, w in enumerate(words)},
+            # Indexes written before digests were stored re-embed every word once
+            digests=meta.get("digests") or [None] * len(words),
+            vectors=vectors,
+            meta_mtime=meta_path.stat().st_mtime,
+        )
+
+    def is_stale(self):
+        """True when another process has added words since this index was loaded."""
+        meta_path = self.index_dir / META_FILE
+        return meta_path.exists() and meta_path.stat().st_mtime != self.snapshot.meta_mtime
+
+    def add(self, texts):
+        """Embed {word: text} for new words and words whose text changed.
+
+        Returns (added, updated). New words are appended; changed words are
+        re-embedded into their existing row.
+        """
+        snap = self.snapshot
+        digests = {w: text_digest(t) for w, t in texts.items()}
+        new = {w: t for w, t in texts.items() if w not in snap.positions}
+        changed = {
+            w: t for w, t in texts.items()
+            if w in snap.positions and snap.digests[snap.positions[w]] != digests[w]
+        }
+        if not new and not changed:
+            return 0, 0
+        if self.embedder is None:
+            raise ValueError("An embedder is required to add words")
+
+        matrix = self.embedder.embed(list(new.values()) + list(changed.values()))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = (matrix / np.maximum(norms, 1e-12)).astype(np.float32)
+        row_bytes = self.dim * 4
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        vectors_path = self.index_dir / VECTORS_FILE
+        # Drop rows left behind by an add that died before its metadata was written
+        expected = len(snap.words) * row_bytes
+        if vectors_path.exists() and vectors_path.stat().st_size > expected:
+            os.truncate(vectors_path, expected)
+        with open(vectors_path, "ab") as f:
+            f.write(matrix[: len(new)].tobytes())
+        if changed:
+            with open(vectors_path, "r+b") as f:
+                for row, word in zip(matrix[len(new) :], changed):
+                    f.seek(snap.positions[word] * row_bytes)
+                    f.write(row.tobytes())
+
+        # Metadata is written last (atomically), so readers never see rows it doesn't list
+        words = snap.words + list(new)
+        previous = snap.digests + [None] * len(new)
+        meta = {
+            "embedder": self.embedder.name,
+            "dim": self.dim,
+            "words": words,
+            "digests": [digests.get(w, d) for w, d in zip(words, previous)],
+        }
+        tmp_path = self.index_dir / (META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_dir / META_FILE)
+
+        self.reload()
+        return len(new), len(changed)
+
+    def similar(self, word, k=10):
+        """Top-k (word, cosine) neighbours of a word already in the index."""
+        snap = self.snapshot
+        if word not in snap.positions:
+            return []
+        return self._query(snap, snap.vectors[snap.positions[word]], k, exclude=word)
+
+    def query_vector(self, vector, k=10, exclude=None):
+        return self._query(self.snapshot, vector, k, exclude)
+
+    @staticmethod
+    def _query(snap, vector, k, exclude):
+        if snap.vectors is None:
+            return []
+        vector = np.asarray(vector, dtype=np.float32)
+        vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+        scores = snap.vectors @ vector
+        if exclude is not None and exclude in snap.positions:
+            scores[snap.positions[exclude]] = -np.inf
+        k = min(k, len(snap.words) - (exclude in snap.positions))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(snap.words[i], float(scores[i])) for i in top]
+
+
+def update_index(json_folder, index_dir=INDEX_DIR, embedder=None):
+    """Embed enriched JSON words in json_folder that are new or whose text changed."""
+    index = EmbeddingIndex(index_dir, embedder or HashingEmbedder())
+    texts = {}
+    for json_file in Path(json_folder).glob("*.json"):
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            continue
+        word = data.get("word")
+        if word and "raw" not in data:
+            texts[word] = entry_text(data)
+    added, updated = index.add(texts)
+    print(f"🧭 Embedding index: {added} words added, {updated} re-embedded, {len(index.words)} total")
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from geminiclient import MissingAPIKeyError
+
+    parser = argparse.ArgumentParser(description="Build or query the word embedding index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="embed new words from an enriched JSON folder")
+    build.add_argument("json_folder", nargs="?", default="output")
+    build.add_argument("--local", action="store_true", help="use the offline hashing embedder")
+    query = sub.add_parser("similar", help="print words closest to WORD")
+    query.add_argument("word")
+    query.add_argument("-k", type=int, default=10)
+    parser.add_argument("--index", default=INDEX_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if args.local:
+            embedder = HashingEmbedder()
+        else:
+            embedder = GeminiEmbedder()
+        try:
+            update_index(args.json_folder, args.index, embedder)
+        except MissingAPIKeyError as e:
+            sys.exit(f"Error: {e}")
+    else:
+        for word, score in EmbeddingIndex(args.index).similar(args.word, args.k):
+            print(f"{score:.3f}  {word}")
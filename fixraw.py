@@ -1,30 +1,9 @@
-import os
 import json
 from pathlib import Path
-import re
-from google import genai
-from google.genai.types import (
-    GenerateContentConfig,
-    GoogleSearch,
-    HttpOptions,
-    Tool,
-)
 
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    print("Error: Please set GEMINI_API_KEY environment variable.")
-    exit(1)
-
-# Configure Gemini client
-client = genai.Client(http_options=HttpOptions(api_version="v1alpha"))
-
-
-def clean_json_response(text: str) -> str:
-    """Remove ```json fences and return clean JSON string."""
-    cleaned = re.sub(
-        r"^```json\s*|\s*```$", "", text.strip(), flags=re.DOTALL | re.MULTILINE
-    )
-    return cleaned.strip()
+from geminicascade import generate_with_cascade
+from geminiclient import MissingAPIKeyError, get_client
+from instrumentation import recorder, start_run
 
 
 def regenerate_json(word: str, raw_text: str = None):
@@ -50,25 +29,21 @@ def regenerate_json(word: str, raw_text: str = None):
         "word", "recent_usage", "definition", "etymology", "synonyms", "antonyms".
         """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash-lite",
-        contents=prompt,
-        config=GenerateContentConfig(
-            tools=[Tool(google_search=GoogleSearch())]  # ✅ Ground with Google Search
-        ),
-    )
-
-    return clean_json_response(response.text)
+    text, _ = generate_with_cascade(get_client(), prompt, word)
+    return text
 
 
 def repair_json_folder(folder="output"):
     folder = Path(folder)
+    rec = recorder()
     for json_file in folder.glob("*.json"):
+        rec.count("files.scanned")
         with open(json_file, "r", encoding="utf-8") as f:
             try:
                 data = json.load(f)
             except json.JSONDecodeError:
                 print(f"⚠️ Skipping invalid JSON file: {json_file}")
+                rec.count("files.unreadable")
                 continue
 
         # Check if it's raw / broken
@@ -78,6 +53,7 @@ def repair_json_folder(folder="output"):
             word = data.get("word") or json_file.stem
             raw_text = data.get("raw", "")
             print(f"🔄 Regenerating JSON for: {word}")
+            rec.count("files.broken")
 
             try:
                 result = regenerate_json(word, raw_text)
@@ -85,13 +61,19 @@ def repair_json_folder(folder="output"):
                     parsed = json.loads(result)
                 except json.JSONDecodeError:
                     print(f"❌ Still invalid JSON for {word}, saving fallback.")
+                    rec.count("files.still_raw")
                     parsed = {"word": word, "raw": result}
 
                 with open(json_file, "w", encoding="utf-8") as f:
                     json.dump(parsed, f, ensure_ascii=False, indent=2)
 
-                print(f"✅ Fixed {word} → {json_file}")
+                if "raw" not in parsed:
+                    rec.count("files.fixed")
+                    print(f"✅ Fixed {word} → {json_file}")
+            except MissingAPIKeyError:
+                raise
             except Exception as e:
+                rec.count("files.error")
                 print(f"❌ Error regenerating {word}: {e}")
 
 
@@ -99,4 +81,11 @@ if __name__ == "__main__":
     import sys
 
     folder = sys.argv[1] if len(sys.argv) > 1 else "output"
-    repair_json_folder(folder)
\ No newline at end of file
+    run = start_run("fixraw")
+    try:
+        with run.stage("repair"):
+            repair_json_folder(folder)
+    except MissingAPIKeyError as e:
+        sys.exit(f"Error: {e}")
+    finally:
+        run.close()
\ No newline at end of file
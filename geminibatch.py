@@ -0,0 +1,206 @@
+import json
+import time
+from pathlib import Path
+
+from geminicascade import TRANSIENT_RETRIES, clean_json_response, parse_cascade, validate_entry
+
+# Terminal states reported by poll()
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+PENDING = "pending"
+
+_GEMINI_STATES = {
+    "JOB_STATE_SUCCEEDED": SUCCEEDED,
+    "JOB_STATE_FAILED": FAILED,
+    "JOB_STATE_CANCELLED": FAILED,
+    "JOB_STATE_EXPIRED": FAILED,
+}
+
+
+class GeminiBatchClient:
+    """Submit/poll/download Gemini Batch API jobs through a genai.Client."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, requests_path, model):
+        from google.genai.types import UploadFileConfig
+
+        uploaded = self.client.files.upload(
+            file=str(requests_path),
+            config=UploadFileConfig(display_name=Path(requests_path).stem, mime_type="jsonl"),
+        )
+        job = self.client.batches.create(
+            model=model,
+            src=uploaded.name,
+            config={"display_name": Path(requests_path).stem},
+        )
+        return job.name
+
+    def poll(self, job_name):
+        job = self.client.batches.get(name=job_name)
+        return _GEMINI_STATES.get(job.state.name, PENDING)
+
+    def results(self, job_name):
+        job = self.client.batches.get(name=job_name)
+        content = self.client.files.download(file=job.dest.file_name)
+        for line in content.decode("utf-8").splitlines():
+            if line.strip():
+                yield line
+
+
+class LocalBatchClient:
+    """In-process stand-in for GeminiBatchClient.
+
+    generate(prompt, model, grounded) returns the model's text; raising marks
+    that line as failed, just like a per-line error in a real batch job.
+    """
+
+    def __init__(self, generate):
+        self.generate = generate
+        self.jobs = {}
+
+    def submit(self, requests_path, model):
+        job_name = f"local/{len(self.jobs)}"
+        self.jobs[job_name] = (Path(requests_path), model)
+        return job_name
+
+    def poll(self, job_name):
+        return SUCCEEDED
+
+    def results(self, job_name):
+        requests_path, model = self.jobs[job_name]
+        with open(requests_path, "r", encoding="utf-8") as f:
+            for line in f:
+                item = json.loads(line)
+                request = item["request"]
+                prompt = request["contents"][0]["parts"][0]["text"]
+                grounded = bool(request.get("tools"))
+                try:
+                    text = self.generate(prompt, model, grounded)
+                except Exception as e:
+                    yield json.dumps({"key": item["key"], "error": {"message": str(e)}})
+                    continue
+                yield json.dumps({
+                    "key": item["key"],
+                    "response": {"candidates": [{"content": {"parts": [{"text": text}]}}]},
+                })
+
+
+def write_batch_requests(prompts, path, grounded=False):
+    """Write one JSONL batch request line per (key, prompt)."""
+    with open(path, "w", encoding="utf-8") as f:
+        for key, prompt in prompts.items():
+            request = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+            if grounded:
+                request["tools"] = [{"google_search": {}}]
+            f.write(json.dumps({"key": key, "request": request}, ensure_ascii=False) + "\n")
+
+
+def response_text(result):
+    """Concatenate the text parts of a batch result line's first candidate."""
+    candidates = (result.get("response") or {}).get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(p.get("text", "") for p in parts)
+
+
+def wait_for_job(batch_client, job_name, poll_interval=30, timeout=24 * 3600):
+    """Block until the job reaches a terminal state; return that state."""
+    deadline = time.monotonic() + timeout
+    while True:
+        state = batch_client.poll(job_name)
+        if state != PENDING:
+            return state
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Batch job {job_name} still pending after {timeout}s")
+        time.sleep(poll_interval)
+
+
+def run_batch(prompts, batch_client, on_result, work_dir, tiers=None, poll_interval=30):
+    """Enrich every prompt through batch jobs, retrying only the failed lines.
+
+    Every key starts on cascade tier 0. A line that comes back invalid, or
+    is missing from a finished job's output, moves to the next tier. Failed
+    or expired jobs and per-line API errors are transport problems: those
+    keys are resubmitted on the same tier, at most TRANSIENT_RETRIES times.
+    on_result(key, text, parsed) is called as each line streams back;
+    parsed is None only for keys that still fail once they run out of
+    tiers or retries. Returns the set of keys that never produced any text.
+    """
+    tiers = tiers or parse_cascade()
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    tier_of = {key: 0 for key in prompts}
+    transient = {key: 0 for key in prompts}  # same-tier retries used
+    pending = dict(prompts)
+    last_text = {}  # key -> latest invalid text, saved raw if no round succeeds
+    given_up = set()
+
+    def retry_same_tier(key):
+        transient[key] += 1
+        if transient[key] > TRANSIENT_RETRIES:
+            given_up.add(key)
+
+    def escalate(key):
+        tier_of[key] += 1
+        if tier_of[key] >= len(tiers):
+            given_up.add(key)
+
+    round_no = 0
+    while pending:
+        by_tier = {}
+        for key in pending:
+            by_tier.setdefault(tier_of[key], []).append(key)
+
+        for tier, keys in sorted(by_tier.items()):
+            model, grounded = tiers[tier]
+            requests_path = work_dir / f"batch_round{round_no}_tier{tier}.jsonl"
+            write_batch_requests({k: pending[k] for k in keys}, requests_path, grounded=grounded)
+
+            job_name = batch_client.submit(requests_path, model)
+            print(f"📦 Submitted {len(keys)} requests to {model}{' +search' if grounded else ''} as {job_name}")
+            state = wait_for_job(batch_client, job_name, poll_interval=poll_interval)
+            if state != SUCCEEDED:
+                print(f"❌ Batch job {job_name} ended as {state}, resubmitting its lines on the same tier")
+                for key in keys:
+                    retry_same_tier(key)
+                continue
+
+            done, returned = set(), set()
+            for line in batch_client.results(job_name):
+                result = json.loads(line)
+                key = result.get("key")
+                if key not in keys or key in returned:
+                    continue
+                returned.add(key)
+                if result.get("error"):
+                    retry_same_tier(key)
+                    continue
+                text = clean_json_response(response_text(result))
+                parsed, _ = validate_entry(text)
+                if parsed is None:
+                    last_text[key] = text
+                    escalate(key)
+                    continue
+                on_result(key, text, parsed)
+                done.add(key)
+
+            # Lines missing from the output escalate like invalid ones
+            for key in keys:
+                if key not in returned:
+                    escalate(key)
+                if key in done:
+                    del pending[key]
+            print(f"✅ Round {round_no}, tier {tier}: {len(done)} ok, {len(keys) - len(done)} failed")
+
+        for key in given_up & pending.keys():
+            del pending[key]
+        round_no += 1
+
+    for key in given_up:
+        if key in last_text:
+            on_result(key, last_text[key], None)
+    return {key for key in given_up if key not in last_text}
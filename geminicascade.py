@@ -0,0 +1,241 @@
+import json
+import os
+import re
+import sys
+import time
+
+from instrumentation import recorder
+
+# Keys every dictionary entry must carry to be accepted
+REQUIRED_KEYS = ["word", "recent_usage", "definition", "etymology", "synonyms", "antonyms"]
+
+# Cheapest tier first; "+search" enables Google Search grounding for that tier.
+# Override with e.g. GEMINI_CASCADE="gemini-2.5-flash-lite,gemini-2.5-flash+search"
+DEFAULT_CASCADE = "gemini-2.5-flash-lite,gemini-2.5-flash-lite+search,gemini-2.5-flash+search"
+
+# USD per 1M tokens (input, output) and per grounded request, used for cost estimates
+MODEL_PRICING = {
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+GROUNDING_PRICE = 0.035
+
+CASCADE_LOG = os.getenv("GEMINI_CASCADE_LOG", "cascade_log.jsonl")
+
+# Same-tier retries for transport errors, with exponential backoff
+TRANSIENT_RETRIES = 2
+RETRY_BACKOFF_S = 2.0
+
+
+def parse_cascade(spec=None):
+    """Parse a cascade spec like "model-a,model-b+search" into [(model, grounded), ...]."""
+    spec = spec or os.getenv("GEMINI_CASCADE") or DEFAULT_CASCADE
+    tiers = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        grounded = item.endswith("+search")
+        model = item[: -len("+search")] if grounded else item
+        tiers.append((model, grounded))
+    if not tiers:
+        raise ValueError(f"Empty model cascade: {spec!r}")
+    return tiers
+
+
+def clean_json_response(text: str) -> str:
+    """Remove ```json fences and return clean JSON string."""
+    cleaned = re.sub(r"^```json\s*|\s*```$", "", text.strip(), flags=re.DOTALL | re.MULTILINE)
+    return cleaned.strip()
+
+
+def validate_entry(text: str):
+    """Return (parsed, None) for a usable entry, or (None, reason) explaining why not."""
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        return None, "invalid_json"
+    if not isinstance(parsed, dict):
+        return None, "not_object"
+
+    missing = [k for k in REQUIRED_KEYS if k not in parsed]
+    if missing:
+        return None, "missing_fields:" + ",".join(missing)
+    if not str(parsed.get("recent_usage") or "").strip():
+        return None, "empty_usage"
+    return parsed, None
+
+
+def estimate_cost(model, grounded, input_tokens, output_tokens):
+    """Rough USD cost of one call, from MODEL_PRICING and GROUNDING_PRICE."""
+    price_in, price_out = MODEL_PRICING.get(model, (0.0, 0.0))
+    cost = (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+    if grounded:
+        cost += GROUNDING_PRICE
+    return cost
+
+
+def _usage_tokens(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return 0, 0
+    input_tokens = usage.prompt_token_count or 0
+    # Thinking tokens are billed as output
+    output_tokens = (usage.candidates_token_count or 0) + (
+        getattr(usage, "thoughts_token_count", None) or 0
+    )
+    return input_tokens, output_tokens
+
+
+def generate_with_cascade(client, prompt, word, tiers=None, log_path=CASCADE_LOG):
+    """Run prompt through the cascade, escalating only when validation fails.
+
+    Returns (text, parsed). parsed is None when every tier failed, in which
+    case text is the last raw response. API errors are retried on the same
+    tier and never escalate; a tier that keeps erroring ends the cascade.
+    Each call's tier, latency, token counts, estimated cost and escalation
+    reason are appended to log_path.
+    """
+    from google.genai.types import GenerateContentConfig, GoogleSearch, Tool
+
+    tiers = tiers or parse_cascade()
+    rec = recorder()
+    attempts = []
+    text, parsed, last_error = "", None, None
+
+    for tier, (model, grounded) in enumerate(tiers):
+        config = GenerateContentConfig(
+            tools=[Tool(google_search=GoogleSearch())] if grounded else None
+        )
+        # Transport errors (rate limits, timeouts) are retried on the same
+        # tier; only a validation failure moves the word to a pricier tier.
+        for retry in range(TRANSIENT_RETRIES + 1):
+            if retry:
+                time.sleep(RETRY_BACKOFF_S * 2 ** (retry - 1))
+            start = time.perf_counter()
+            try:
+                response = client.models.generate_content(
+                    model=model, contents=prompt, config=config
+                )
+            except Exception as e:
+                last_error = e
+                attempts.append({
+                    "tier": tier,
+                    "model": model,
+                    "grounded": grounded,
+                    "latency_s": round(time.perf_counter() - start, 3),
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "cost_usd": 0.0,
+                    "reason": f"error:{type(e).__name__}",
+                })
+                continue
+            break
+        else:
+            # Still failing after retries: stop rather than pay for a bigger model
+            break
+
+        latency = time.perf_counter() - start
+        input_tokens, output_tokens = _usage_tokens(response)
+        text = clean_json_response(response.text or "")
+        parsed, reason = validate_entry(text)
+        attempts.append({
+            "tier": tier,
+            "model": model,
+            "grounded": grounded,
+            "latency_s": round(latency, 3),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost_usd": round(estimate_cost(model, grounded, input_tokens, output_tokens), 6),
+            "reason": reason,
+        })
+        if parsed is not None:
+            break
+
+    for a in attempts:
+        rec.record_call(
+            "api.latency_s",
+            a["latency_s"],
+            word=word,
+            model=a["model"],
+            grounded=a["grounded"],
+            input_tokens=a["input_tokens"],
+            output_tokens=a["output_tokens"],
+            reason=a["reason"],
+        )
+        rec.count("api.calls")
+        rec.count("tokens.in", a["input_tokens"])
+        rec.count("tokens.out", a["output_tokens"])
+        if a["reason"] == "invalid_json":
+            rec.count("json.invalid")
+        elif a["reason"] and a["reason"].startswith("error:"):
+            rec.count("api.errors")
+    rec.count("api.retries", len(attempts) - 1)
+    if parsed is None:
+        rec.count("words.failed")
+
+    if log_path:
+        record = {
+            "word": word,
+            "ok": parsed is not None,
+            "final_tier": attempts[-1]["tier"] if parsed is not None else None,
+            "latency_s": round(sum(a["latency_s"] for a in attempts), 3),
+            "cost_usd": round(sum(a["cost_usd"] for a in attempts), 6),
+            "attempts": attempts,
+        }
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if parsed is None and not text and last_error is not None:
+        raise last_error
+    return text, parsed
+
+
+def summarize_log(log_path=CASCADE_LOG):
+    """Print average per-word latency/cost, per-tier API errors and escalation reasons."""
+    words = ok = 0
+    total_latency = total_cost = 0.0
+    tiers = {}
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            words += 1
+            ok += record["ok"]
+            total_latency += record["latency_s"]
+            total_cost += record["cost_usd"]
+            for a in record["attempts"]:
+                key = f"{a['model']}{'+search' if a['grounded'] else ''}"
+                stats = tiers.setdefault(
+                    key, {"calls": 0, "latency_s": 0.0, "cost_usd": 0.0, "errors": 0, "reasons": {}}
+                )
+                stats["calls"] += 1
+                stats["latency_s"] += a["latency_s"]
+                stats["cost_usd"] += a["cost_usd"]
+                if not a["reason"]:
+                    continue
+                reason = a["reason"].split(":")[0]
+                if reason == "error":
+                    # Retried on the same tier, so not an escalation
+                    stats["errors"] += 1
+                else:
+                    stats["reasons"][reason] = stats["reasons"].get(reason, 0) + 1
+
+    if not words:
+        print("No cascade records found.")
+        return
+    print(f"Words: {words} ({ok} valid)")
+    print(f"Avg latency/word: {total_latency / words:.2f}s, avg cost/word: ${total_cost / words:.5f}")
+    for key, stats in tiers.items():
+        calls = stats["calls"]
+        print(
+            f"  {key}: {calls} calls, avg {stats['latency_s'] / calls:.2f}s, "
+            f"${stats['cost_usd']:.4f} total, errors {stats['errors']}, "
+            f"escalations {stats['reasons'] or '{}'}"
+        )
+
+
+if __name__ == "__main__":
+    summarize_log(sys.argv[1] if len(sys.argv) > 1 else CASCADE_LOG)
@@ -0,0 +1,30 @@
+import os
+import threading
+
+_client = None
+_lock = threading.Lock()
+
+
+class MissingAPIKeyError(RuntimeError):
+    """GEMINI_API_KEY is not set; entry points report this and exit."""
+
+
+def get_client():
+    """Return the process-wide Gemini client, importing the SDK on first use.
+
+    Runs that never reach the API (usage errors, fully cached decks) skip
+    both the google.genai import and the API key check.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                if not os.getenv("GEMINI_API_KEY"):
+                    raise MissingAPIKeyError("Please set GEMINI_API_KEY environment variable.")
+
+                from google import genai
+                from google.genai.types import HttpOptions
+
+                # v1alpha for grounding support
+                _client = genai.Client(http_options=HttpOptions(api_version="v1alpha"))
+    return _client
@@ -0,0 +1,212 @@
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+RUN_LOG = os.getenv("ANKI_RUN_LOG", "run_log.jsonl")
+
+# Upper bounds in seconds; wide enough for both sqlite reads and grounded model calls
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+
+class Histogram:
+    """Fixed-bucket histogram: constant memory however many values are observed."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (max for the +Inf bucket)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+
+class RunRecorder:
+    """Collects stage timings, histograms and counters for one run.
+
+    Every stage, API call and the final summary are appended to a JSONL run
+    log tagged with a run id, so several runs can share one file.
+    """
+
+    def __init__(self, name, log_path=RUN_LOG, profile_path=None):
+        self.name = name
+        self.run_id = os.urandom(6).hex()
+        self.log_path = log_path
+        self.profile_path = profile_path
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._log = open(log_path, "a", encoding="utf-8") if log_path else None
+        self.event("run_start", argv=sys.argv)
+
+    def event(self, kind, **fields):
+        if self._log is None:
+            return
+        record = {"ts": round(time.time(), 3), "run": self.run_id, "name": self.name, "event": kind}
+        record.update(fields)
+        with self._lock:
+            self._log.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + seconds
+            self.event("stage", stage=name, seconds=round(seconds, 6))
+
+    def observe(self, metric, value):
+        with self._lock:
+            hist = self.histograms.get(metric)
+            if hist is None:
+                hist = self.histograms[metric] = Histogram()
+            hist.observe(value)
+
+    def count(self, metric, n=1):
+        with self._lock:
+            self.counters[metric] = self.counters.get(metric, 0) + n
+
+    def record_call(self, metric, seconds, **fields):
+        """One external call: feeds the latency histogram and the run log."""
+        self.observe(metric, seconds)
+        self.event("call", metric=metric, seconds=round(seconds, 6), **fields)
+
+    @contextmanager
+    def profile(self, name):
+        """cProfile the block when the run was started with a profile path."""
+        if not self.profile_path:
+            yield
+            return
+        # Imported here: only profiled runs pay for cProfile/pstats
+        import cProfile
+        import io
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            path = f"{self.profile_path}.{name}.prof"
+            profiler.dump_stats(path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(15)
+            print(f"🧪 Profile of {name} saved to {path}", file=sys.stderr)
+            print(out.getvalue(), file=sys.stderr)
+
+    def summary(self):
+        with self._lock:
+            hit_rates = {}
+            for metric in self.counters:
+                base, _, kind = metric.rpartition(".")
+                if kind in ("hit", "miss") and base not in hit_rates:
+                    hits = self.counters.get(base + ".hit", 0)
+                    total = hits + self.counters.get(base + ".miss", 0)
+                    hit_rates[base] = round(hits / total, 4) if total else None
+            return {
+                "seconds": round(time.perf_counter() - self.started, 6),
+                "stages": {k: round(v, 6) for k, v in self.stages.items()},
+                "counters": dict(self.counters),
+                "hit_rates": hit_rates,
+                "histograms": {k: h.to_dict() for k, h in self.histograms.items()},
+            }
+
+    def close(self, file=sys.stdout):
+        """Log the summary, print it, and close the run log."""
+        summary = self.summary()
+        self.event("summary", **summary)
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+        print(f"⏱️ {self.name} finished in {summary['seconds']:.2f}s (run {self.run_id})", file=file)
+        for stage, seconds in summary["stages"].items():
+            print(f"   stage {stage:<16} {seconds:9.3f}s", file=file)
+        for metric, hist in summary["histograms"].items():
+            print(
+                f"   {metric:<22} n={hist['count']} avg={hist['sum'] / hist['count']:.3f}s "
+                f"p50<={hist['p50']} p95<={hist['p95']} max={hist['max']:.3f}s",
+                file=file,
+            )
+        for metric, n in sorted(summary["counters"].items()):
+            print(f"   {metric:<22} {n}", file=file)
+        for base, rate in summary["hit_rates"].items():
+            if rate is not None:
+                print(f"   {base + ' hit rate':<22} {rate:.1%}", file=file)
+        return summary
+
+
+class _NullRecorder:
+    """Stand-in used when no run is active, so library code can always record."""
+
+    def event(self, kind, **fields):
+        pass
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+    def observe(self, metric, value):
+        pass
+
+    def count(self, metric, n=1):
+        pass
+
+    def record_call(self, metric, seconds, **fields):
+        pass
+
+    @contextmanager
+    def profile(self, name):
+        yield
+
+
+_current = _NullRecorder()
+
+
+def start_run(name, log_path=RUN_LOG, profile_path=None):
+    """Make a new RunRecorder the process-wide recorder returned by recorder()."""
+    global _current
+    _current = RunRecorder(name, log_path=log_path, profile_path=profile_path or os.getenv("ANKI_PROFILE"))
+    return _current
+
+
+def recorder():
+    return _current
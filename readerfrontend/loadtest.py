@@ -0,0 +1,84 @@
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def fetch(url):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            body = response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        body, status = b"", e.code
+    except OSError:
+        body, status = b"", None
+    return time.perf_counter() - start, status, body
+
+
+def run(base_url, requests=200, concurrency=8, audio=True):
+    """Hit /next (and /audio for the returned word) from concurrent clients."""
+    latencies = {}
+    errors = {}
+    lock = threading.Lock()
+
+    def record(route, seconds, status):
+        with lock:
+            latencies.setdefault(route, []).append(seconds)
+            if status != 200:
+                errors[route] = errors.get(route, 0) + 1
+
+    def one_round(_):
+        seconds, status, body = fetch(f"{base_url}/next")
+        record("/next", seconds, status)
+        if not audio or status != 200:
+            return
+        word = json.loads(body).get("word")
+        if word:
+            seconds, status, _ = fetch(f"{base_url}/audio/{urllib.parse.quote(word)}")
+            record("/audio/<word>", seconds, status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_round, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{total} requests in {elapsed:.2f}s ({total / elapsed:.1f} req/s), concurrency {concurrency}")
+    print(f"{'route':<16}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'errors':>8}")
+    for route, values in latencies.items():
+        print(
+            f"{route:<16}{len(values):>6}{percentile(values, 0.5) * 1000:>10.1f}"
+            f"{percentile(values, 0.99) * 1000:>10.1f}{statistics.fmean(values) * 1000:>10.1f}"
+            f"{errors.get(route, 0):>8}"
+        )
+    return latencies
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local load test for the reader app.")
+    parser.add_argument("base_url", nargs="?", default="http://127.0.0.1:5000")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="rounds of /next (+ /audio)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--no-audio", action="store_true", help="only hit /next")
+    args = parser.parse_args()
+
+    try:
+        run(args.base_url.rstrip("/"), args.requests, args.concurrency, audio=not args.no_audio)
+    except KeyboardInterrupt:
+        sys.exit(1)
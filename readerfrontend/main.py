@@ -1,15 +1,52 @@
-from flask import Flask, render_template, jsonify, send_file
+from flask import Flask, Response, g, render_template, jsonify, send_file, request
 import sqlite3
+import hashlib
 import json
 import os
+import sys
+import threading
+import time
 from gtts import gTTS
-from io import BytesIO
+
+import metrics
+
+# embeddingindex.py lives in the repository root, next to this app's folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from embeddingindex import EmbeddingIndex
 
 DB_FILE = "words.db"
 WORDS_DIR = "../output_jsons"
+EMBED_INDEX_DIR = "../embedding_index"
+AUDIO_CACHE_DIR = "audio_cache"
 
 app = Flask(__name__)
 
+
+# ---------- Metrics ----------
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    # Label by route pattern, not path, so /audio/<word> is one series
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.observe(
+        "http_request_duration_seconds",
+        time.perf_counter() - g.request_start,
+        help="Request latency by route.",
+        route=route,
+        method=request.method,
+        status=response.status_code,
+    )
+    return response
+
+
+def db_timer(query):
+    return metrics.timed("db_query_duration_seconds", help="SQLite query latency.", query=query)
+
+
 # ---------- Database ----------
 def init_db():
     conn = sqlite3.connect(DB_FILE)
@@ -76,19 +113,20 @@ def load_words_from_folder():
 
 # ---------- Logic ----------
 def get_next_word():
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT word, definition, recent_usage, etymology,
-               synonyms, antonyms, frequency, read_count
-        FROM words
-        ORDER BY read_count ASC, frequency DESC
-        LIMIT 1
-        """
-    )
-    row = cur.fetchone()
-    conn.close()
+    with db_timer("next_word"):
+        conn = sqlite3.connect(DB_FILE)
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT word, definition, recent_usage, etymology,
+                   synonyms, antonyms, frequency, read_count
+            FROM words
+            ORDER BY read_count ASC, frequency DESC
+            LIMIT 1
+            """
+        )
+        row = cur.fetchone()
+        conn.close()
     if not row:
         return None
 
@@ -105,11 +143,76 @@ def get_next_word():
 
 
 def increment_count(word):
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    cur.execute("UPDATE words SET read_count = read_count + 1 WHERE word = ?", (word,))
-    conn.commit()
-    conn.close()
+    with db_timer("increment_count"):
+        conn = sqlite3.connect(DB_FILE)
+        cur = conn.cursor()
+        cur.execute("UPDATE words SET read_count = read_count + 1 WHERE word = ?", (word,))
+        conn.commit()
+        conn.close()
+
+
+def get_audio_text(word):
+    with db_timer("audio_lookup"):
+        conn = sqlite3.connect(DB_FILE)
+        cur = conn.cursor()
+        cur.execute(
+            """SELECT definition, recent_usage FROM words WHERE word = ?""", (word,)
+        )
+        row = cur.fetchone()
+        conn.close()
+
+    if not row:
+        return None
+
+    definition, usage = row
+    text = f"{word}. Definition: {definition}"
+    if usage:
+        text += f" Example: {usage}"
+    return text
+
+
+def render_audio(text):
+    """Return the path of the MP3 for text, rendering it with gTTS on a cache miss."""
+    os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+    # Keyed by the spoken text, so an edited definition renders fresh audio
+    path = os.path.join(AUDIO_CACHE_DIR, hashlib.sha1(text.encode("utf-8")).hexdigest() + ".mp3")
+    if os.path.exists(path):
+        metrics.inc("audio_cache_requests_total", help="Audio requests by cache result.", result="hit")
+        return path
+
+    metrics.inc("audio_cache_requests_total", help="Audio requests by cache result.", result="miss")
+    with metrics.timed("tts_render_duration_seconds", help="gTTS synthesis time."):
+        tts = gTTS(text=text, lang="en")
+        tmp_path = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        try:
+            tts.save(tmp_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    # Rename into place so concurrent requests never serve a half-written file
+    os.replace(tmp_path, path)
+    metrics.inc("tts_renders_total", help="Number of gTTS renders.")
+    return path
+
+
+_embedding_index = None
+_embedding_lock = threading.Lock()
+
+
+def get_embedding_index():
+    """Open the shared embedding index once, reopening it when new words are added."""
+    global _embedding_index
+    # --serve answers requests on several threads; only one may (re)load.
+    # Queries read the index's snapshot, so they never need the lock.
+    with _embedding_lock:
+        if _embedding_index is None:
+            if not os.path.exists(os.path.join(EMBED_INDEX_DIR, "words.json")):
+                return None
+            _embedding_index = EmbeddingIndex(EMBED_INDEX_DIR)
+        elif _embedding_index.is_stale():
+            _embedding_index.reload()
+        return _embedding_index
 
 
 # ---------- Routes ----------
@@ -127,32 +230,70 @@ def next_word():
     return jsonify(word_data)
 
 
+@app.route("/similar/<word>")
+def similar(word):
+    index = get_embedding_index()
+    if index is None:
+        return jsonify([])
+    k = request.args.get("k", 8, type=int)
+    return jsonify([{"word": w, "score": round(score, 4)} for w, score in index.similar(word, k)])
+
+
 @app.route("/audio/<word>")
 def audio(word):
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    cur.execute(
-        """SELECT definition, recent_usage FROM words WHERE word = ?""", (word,)
+    text = get_audio_text(word)
+    if text is None:
+        return jsonify({"error": "Word not found"}), 404
+    path = os.path.abspath(render_audio(text))
+    return send_file(path, mimetype="audio/mpeg", as_attachment=False)
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    hits = metrics.counter_value("audio_cache_requests_total", result="hit")
+    misses = metrics.counter_value("audio_cache_requests_total", result="miss")
+    ratio = hits / (hits + misses) if hits + misses else 0
+    body = metrics.render(
+        {"audio_cache_hit_ratio": ("Share of audio requests served from the cache.", f"{ratio:.4f}")}
     )
-    row = cur.fetchone()
-    conn.close()
+    return Response(body, mimetype="text/plain; version=0.0.4")
 
-    if not row:
-        return jsonify({"error": "Word not found"}), 404
 
-    definition, usage = row
-    text = f"{word}. Definition: {definition}"
-    if usage:
-        text += f" Example: {usage}"
+def serve(host, port, threads):
+    """Production serving: multi-threaded WSGI server, no debugger or reloader."""
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        from socketserver import ThreadingMixIn
+        from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+        class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+            daemon_threads = True
 
-    tts = gTTS(text=text, lang="en")
-    audio_fp = BytesIO()
-    tts.write_to_fp(audio_fp)
-    audio_fp.seek(0)
-    return send_file(audio_fp, mimetype="audio/mpeg", as_attachment=False)
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+        print(f"Serving on http://{host}:{port} (wsgiref, threaded)")
+        make_server(host, port, app, ThreadingWSGIServer, QuietHandler).serve_forever()
+    else:
+        print(f"Serving on http://{host}:{port} (waitress, {threads} threads)")
+        waitress_serve(app, host=host, port=port, threads=threads)
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="TTS word reader.")
+    parser.add_argument("--serve", action="store_true", help="production mode: threaded WSGI, no debug reloader (waitress via the serve extra)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8, help="worker threads (waitress only)")
+    args = parser.parse_args()
+
     init_db()
     load_words_from_folder()
-    app.run(debug=True)
\ No newline at end of file
+    if args.serve:
+        serve(args.host, args.port, args.threads)
+    else:
+        app.run(debug=True, host=args.host, port=args.port)
\ No newline at end of file
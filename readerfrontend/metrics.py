@@ -0,0 +1,85 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds; covers sub-millisecond sqlite reads up to slow TTS renders
+DEFAULT_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+_lock = threading.Lock()
+_histograms = {}  # name -> (help, {labels: [bucket counts..., sum, count]})
+_counters = {}  # name -> (help, {labels: value})
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def observe(name, value, help="", **labels):
+    key = _labels_key(labels)
+    with _lock:
+        _, series = _histograms.setdefault(name, (help, {}))
+        row = series.get(key)
+        if row is None:
+            row = series[key] = [0] * (len(DEFAULT_BUCKETS) + 3)
+        row[bisect_left(DEFAULT_BUCKETS, value)] += 1
+        row[-2] += value
+        row[-1] += 1
+
+
+def inc(name, n=1, help="", **labels):
+    key = _labels_key(labels)
+    with _lock:
+        _, series = _counters.setdefault(name, (help, {}))
+        series[key] = series.get(key, 0) + n
+
+
+def counter_value(name, **labels):
+    with _lock:
+        return _counters.get(name, ("", {}))[1].get(_labels_key(labels), 0)
+
+
+@contextmanager
+def timed(name, help="", **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, help=help, **labels)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render(extra_gauges=None):
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    with _lock:
+        for name, (help, series) in sorted(_counters.items()):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(key)} {value}")
+        for name, (help, series) in sorted(_histograms.items()):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, row in sorted(series.items()):
+                cumulative = 0
+                for bound, n in zip(DEFAULT_BUCKETS + ["+Inf"], row[:-2]):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {row[-2]:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {row[-1]}")
+    for name, (help, value) in sorted((extra_gauges or {}).items()):
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
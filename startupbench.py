@@ -0,0 +1,55 @@
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = [
+    "ankidefinition",
+    "ankidefinitionperword",
+    "fixraw",
+    "ankiextractor",
+    "ankiexporter",
+    "decksync",
+    "wordnorm",
+    "subsetexport",
+]
+
+
+def import_time_us(module):
+    """Cumulative import time of module and everything it imports, from -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Only top-level imports; nested ones are already in their parent's cumulative
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total += int(cumulative)
+    return total
+
+
+def wall_time(argv):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *argv], capture_output=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'module':<24}{'import (ms)':>12}")
+    for module in ENTRY_POINTS:
+        try:
+            print(f"{module:<24}{import_time_us(module) / 1000:>12.1f}")
+        except RuntimeError as e:
+            print(f"{module:<24}{'failed':>12}  {e}")
+
+    # Optionally time a whole run, e.g. a deck whose words are all cached:
+    #   python startupbench.py ankidefinitionperword.py deck.apkg output
+    if len(sys.argv) > 1:
+        runs = [wall_time(sys.argv[1:]) for _ in range(3)]
+        print(f"\n{' '.join(sys.argv[1:])}: best of 3 = {min(runs) * 1000:.0f} ms")
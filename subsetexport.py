@@ -0,0 +1,156 @@
+import errno
+import json
+import os
+import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from wordnorm import normalize_word, output_stem
+
+FICLONE = 0x40049409  # Linux ioctl: share the source file's extents (copy-on-write)
+
+# Tried in this order by "auto"; a method that the filesystem rejects once is
+# not tried again for the rest of the run.
+METHODS = ["reflink", "hardlink", "copy"]
+
+
+def read_word_list(path):
+    """Words or <word>.json filenames, one per line; blank lines and # comments ignored."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def query_words(db_path, query):
+    """First column of every row returned by query, e.g. against readerfrontend's words.db."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute(query) if row[0]]
+    finally:
+        conn.close()
+
+
+def resolve_filenames(words, source_folder):
+    """Map requested words to output filenames, following canonical_index.jsonl if present."""
+    index_path = Path(source_folder) / "canonical_index.jsonl"
+    by_entry = {}
+    if index_path.exists():
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                by_entry[record["entry"]] = record["file"]
+                by_entry.setdefault(record["key"], record["file"])
+
+    filenames = {}
+    for word in words:
+        if word.endswith(".json"):
+            filenames[word] = word
+        else:
+            filenames[word] = by_entry.get(word) or by_entry.get(normalize_word(word)) or (
+                output_stem(normalize_word(word)) + ".json"
+            )
+    return filenames
+
+
+def _reflink(src, dst):
+    import fcntl
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.remove(dst)
+            raise
+
+
+def _link_one(src, dst, methods, disabled):
+    if os.path.lexists(dst):
+        os.remove(dst)
+    for method in methods:
+        if method in disabled:
+            continue
+        try:
+            if method == "reflink":
+                _reflink(src, dst)
+            elif method == "hardlink":
+                os.link(src, dst)
+            else:
+                shutil.copy2(src, dst)
+            return method
+        except (OSError, ImportError) as e:
+            if method == "copy":
+                raise
+            # Cross-device links and filesystems without reflink support fail
+            # for every file, so stop trying that method.
+            if isinstance(e, ImportError) or e.errno in (
+                errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EPERM,
+            ):
+                disabled.add(method)
+    raise OSError(f"Could not materialize {dst}")
+
+
+def export_subset(words, source_folder, dest_folder, method="auto", workers=8):
+    """Materialize the requested words' JSON files into dest_folder.
+
+    Files are reflinked or hardlinked where the filesystem allows, so
+    overlapping study sets share storage with the source; plain copies are
+    the fallback. Returns (counts by method, missing words).
+    """
+    os.makedirs(dest_folder, exist_ok=True)
+    methods = METHODS if method == "auto" else [method]
+
+    # One directory scan instead of an exists() call per word
+    with os.scandir(source_folder) as it:
+        available = {entry.name for entry in it if entry.is_file()}
+
+    filenames = resolve_filenames(words, source_folder)
+    missing = [word for word, name in filenames.items() if name not in available]
+    todo = sorted({name for name in filenames.values() if name in available})
+
+    disabled = set()
+    counts = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            lambda name: _link_one(
+                os.path.join(source_folder, name), os.path.join(dest_folder, name), methods, disabled
+            ),
+            todo,
+        )
+        for used in results:
+            counts[used] = counts.get(used, 0) + 1
+
+    summary = ", ".join(f"{n} {m}" for m, n in counts.items()) or "nothing"
+    print(f"📁 Exported {len(todo)} files to {dest_folder} ({summary}), {len(missing)} missing")
+    return counts, missing
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a study subset of enriched word files.")
+    parser.add_argument("dest_folder", help="folder to create the subset in")
+    parser.add_argument("--source", default="output", help="folder of enriched <word>.json files")
+    parser.add_argument("--words", metavar="FILE", help="word list file (words or <word>.json names)")
+    parser.add_argument("--db", help="sqlite result store to query, e.g. readerfrontend/words.db")
+    parser.add_argument("--query", help="SQL whose first column yields the words, used with --db")
+    parser.add_argument("--method", choices=["auto"] + METHODS, default="auto")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--missing-out", metavar="FILE", help="write missing words to this file")
+    args = parser.parse_args()
+
+    if args.words:
+        words = read_word_list(args.words)
+    elif args.db and args.query:
+        words = query_words(args.db, args.query)
+    else:
+        parser.error("give either --words FILE or --db DB --query SQL")
+
+    _, missing = export_subset(words, args.source, args.dest_folder, args.method, args.workers)
+    if missing:
+        if args.missing_out:
+            with open(args.missing_out, "w", encoding="utf-8") as f:
+                f.write("\n".join(missing) + "\n")
+            print(f"Missing words written to {args.missing_out}")
+        else:
+            print("Missing: " + ", ".join(missing))
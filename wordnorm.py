@@ -0,0 +1,185 @@
+import hashlib
+import json
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+# (suffix, replacements) tried in order; a candidate only counts if it is
+# itself a word in the same deck, so "abated" folds into "abate" but never
+# into a made-up stem. "+e" comes first so "hoped" prefers "hope" to "hop".
+INFLECTION_RULES = [
+    ("ies", ["y"]),
+    ("ied", ["y"]),
+    ("ing", ["", "e"]),
+    ("ed", ["e", ""]),
+    ("es", [""]),
+    ("s", [""]),
+]
+
+# Words that look inflected but are their own entries ("news" is not "new"+s)
+LEMMA_EXCEPTIONS = frozenset("""
+    news lens series species means goods arms glasses spectacles physics ethics
+    politics economics mathematics always perhaps whereas thus alas bias chaos
+    bated wicked sacred naked crooked rugged ragged jagged dogged wretched
+    beloved aged learned seed feed weed deed heed need reed speed bleed breed
+    greed steed creed shed bed red wed led fled sped bred
+""".split())
+
+
+# Sentence punctuation stripped from the ends of an entry. Symbols such as
+# + # $ % - are part of the word ("C++", "-ism", "100%") and are kept.
+EDGE_PUNCTUATION = set(".,;:!?\"'")
+# Unicode open/close brackets and initial/final quotes
+EDGE_CATEGORIES = {"Ps", "Pe", "Pi", "Pf"}
+
+
+def _is_edge_punctuation(ch):
+    return ch in EDGE_PUNCTUATION or unicodedata.category(ch) in EDGE_CATEGORIES
+
+
+def normalize_word(word: str) -> str:
+    """Canonical form of a word: NFKC, casefolded, outer sentence punctuation stripped."""
+    word = unicodedata.normalize("NFKC", word).casefold()
+    word = re.sub(r"\s+", " ", word).strip()
+    start, end = 0, len(word)
+    while start < end and _is_edge_punctuation(word[start]):
+        start += 1
+    while end > start and _is_edge_punctuation(word[end - 1]):
+        end -= 1
+    return word[start:end].strip()
+
+
+def lemma_candidates(key: str):
+    """Possible base forms of key by stripping inflectional suffixes."""
+    if key in LEMMA_EXCEPTIONS:
+        return
+    for suffix, replacements in INFLECTION_RULES:
+        if not key.endswith(suffix) or len(key) - len(suffix) < 2:
+            continue
+        stem = key[: -len(suffix)]
+        for replacement in replacements:
+            if len(stem + replacement) >= 3:
+                yield stem + replacement
+        # Doubled final consonant: "stopped" -> "stop"
+        if suffix in ("ed", "ing") and len(stem) > 3 and stem[-1] == stem[-2]:
+            yield stem[:-1]
+
+
+def safe_word(word: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_-]+", "_", word)
+
+
+def output_stem(key: str) -> str:
+    """Output filename stem for a canonical key; depends on nothing but the key.
+
+    Keys that safe_word leaves unchanged use it as is. Any other key gets a
+    short hash suffix, so "a/b" and "a b" never share (or swap) a file.
+    """
+    stem = safe_word(key)
+    if stem == key:
+        return stem
+    return f"{stem}_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+
+
+def build_canonical_index(words, lemmatize=False):
+    """Group deck entries by canonical key.
+
+    Returns (index, stats): index maps each canonical key to
+    {"word": display form sent to the model, "file": output stem,
+    "entries": [deck entries]}, and stats counts how many entries were
+    folded away as exact duplicates, case/punctuation variants or inflections.
+    """
+    stats = {"entries": 0, "duplicates": 0, "variants": 0, "inflections": 0}
+    groups = {}
+    seen = set()
+    for word in words:
+        stats["entries"] += 1
+        key = normalize_word(word)
+        if not key:
+            continue
+        if word in seen:
+            stats["duplicates"] += 1
+        elif key in groups:
+            stats["variants"] += 1
+        seen.add(word)
+        groups.setdefault(key, []).append(word)
+
+    canonical = {key: key for key in groups}
+    if lemmatize:
+        for key in groups:
+            for candidate in lemma_candidates(key):
+                if candidate in groups and candidate != key:
+                    canonical[key] = candidate
+                    break
+        # Resolve chains like "abatements" -> "abatement" -> "abate"
+        for key in canonical:
+            target, hops = canonical[key], 0
+            while canonical[target] != target and hops < 5:
+                target, hops = canonical[target], hops + 1
+            canonical[key] = target
+
+    index = {}
+    for key, entries in groups.items():
+        root = canonical[key]
+        if root != key:
+            stats["inflections"] += 1
+        group = index.setdefault(root, {"word": None, "file": None, "entries": []})
+        group["entries"].extend(entries)
+    for root, group in index.items():
+        # Prefer the deck's own spelling of the base form for the prompt
+        group["word"] = next(
+            (e for e in groups[root] if normalize_word(e) == e.strip()), groups[root][0].strip()
+        )
+        group["file"] = output_stem(root)
+
+    stats["canonical"] = len(index)
+    stats["saved_calls"] = stats["duplicates"] + stats["variants"] + stats["inflections"]
+    return index, stats
+
+
+def read_index(path):
+    """{canonical key: output filename} recorded by a previous write_index, if any."""
+    files = {}
+    if Path(path).exists():
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    files[record["key"]] = record["file"]
+    return files
+
+
+def write_index(index, path):
+    """Write one JSONL line per deck entry mapping it to its canonical output file."""
+    with open(path, "w", encoding="utf-8") as f:
+        for key, group in index.items():
+            for entry in dict.fromkeys(group["entries"]):
+                f.write(json.dumps(
+                    {"entry": entry, "key": key, "file": group["file"] + ".json"},
+                    ensure_ascii=False,
+                ) + "\n")
+
+
+def print_dedup_report(stats):
+    print(
+        f"🧮 {stats['entries']} deck entries → {stats['canonical']} canonical words "
+        f"({stats['saved_calls']} API calls saved: {stats['duplicates']} duplicates, "
+        f"{stats['variants']} case/punctuation variants, {stats['inflections']} inflections)"
+    )
+
+
+if __name__ == "__main__":
+    from decksync import extract_sort_field_words
+
+    lemmatize = "--lemma" in sys.argv[1:]
+    decks = [arg for arg in sys.argv[1:] if arg != "--lemma"]
+    if not decks:
+        print("Usage: python wordnorm.py [--lemma] deck.apkg [deck2.apkg ...]")
+        sys.exit(1)
+
+    words = []
+    for apkg_path in decks:
+        words.extend(extract_sort_field_words(apkg_path))
+    _, stats = build_canonical_index(words, lemmatize=lemmatize)
+    print_dedup_report(stats)